@@ -0,0 +1,191 @@
+'''
+PostgreSQL backend which keeps connections open in a per process pool
+instead of opening one for every request.
+
+Django closes the connection of a thread at the end of every request
+(CONN_MAX_AGE = 0), which here puts it back in the pool, so a pool
+of a few connections serves every thread of the process. The pool is
+configured by the POOL entry of the database settings:
+
+    SIZE: most connections open at once
+    MAX_LIFETIME: seconds after which a connection is closed instead of reused
+    CHECK_AFTER: connections idle for longer are pinged before being reused
+    TIMEOUT: seconds to wait for a free connection before raising OperationalError
+
+Pools are created on first use, so uwsgi must load the app in the
+workers (lazy-apps) for connections not to be shared across forks.
+'''
+from collections import deque
+from functools import partial
+from threading import Condition, Lock
+from django.db.backends.postgresql import base
+from django.db.backends.base.base import NO_DB_ALIAS
+from psycopg2 import extensions
+import logging
+import time
+
+Database = base.Database
+logger = logging.getLogger(__name__)
+
+_pools = {}
+_pools_lock = Lock()
+
+
+class ConnectionPool:
+    '''
+    Thread safe pool of open connections
+    '''
+
+    def __init__(self, alias, size=4, max_lifetime=1800, check_after=10, timeout=10):
+        self.alias = alias
+        self.size = size
+        self.max_lifetime = max_lifetime
+        self.check_after = check_after
+        self.timeout = timeout
+        # (connection, returned at) pairs, reused last in first out
+        # so that rarely needed connections reach their lifetime
+        self.idle = deque()
+        self.created_at = {}
+        self.in_use = 0
+        self.condition = Condition()
+        self.counters = {'created': 0, 'reused': 0, 'discarded': 0, 'waits': 0, 'timeouts': 0}
+
+    def checkout(self, connect):
+        '''
+        Returns a healthy idle connection, or a new one from `connect()`
+        if none is idle. Waits for a connection to be returned when the
+        pool is full.
+        '''
+        with self.condition:
+            if not self.idle and self.in_use >= self.size:
+                self.counters['waits'] += 1
+                if not self.condition.wait_for(lambda: self.idle or self.in_use < self.size, self.timeout):
+                    self.counters['timeouts'] += 1
+                    raise Database.OperationalError(
+                        'No free connection in the pool of {} after {}s'.format(self.alias, self.timeout))
+            self.in_use += 1
+
+        try:
+            while True:
+                with self.condition:
+                    entry = self.idle.pop() if self.idle else None
+                if entry is None:
+                    break
+                connection, returned_at = entry
+                if self.is_healthy(connection, returned_at):
+                    with self.condition:
+                        self.counters['reused'] += 1
+                    return connection
+                self.discard(connection)
+
+            connection = connect()
+            with self.condition:
+                self.created_at[connection] = time.monotonic()
+                self.counters['created'] += 1
+            return connection
+        except BaseException:
+            self.release()
+            raise
+
+    def checkin(self, connection, broken=False):
+        '''
+        Puts the connection back in the pool, closes it if it is broken,
+        past its lifetime or cannot be rolled back
+        '''
+        try:
+            if not broken and not connection.closed:
+                if connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+            broken = broken or connection.closed or self.is_expired(connection)
+        except Database.Error:
+            broken = True
+
+        if broken:
+            self.discard(connection)
+        else:
+            with self.condition:
+                self.idle.append((connection, time.monotonic()))
+        self.release()
+
+    def release(self):
+        with self.condition:
+            self.in_use -= 1
+            self.condition.notify()
+
+    def is_expired(self, connection):
+        return time.monotonic() - self.created_at.get(connection, 0) > self.max_lifetime
+
+    def is_healthy(self, connection, returned_at):
+        if connection.closed or self.is_expired(connection):
+            return False
+        if time.monotonic() - returned_at < self.check_after:
+            return True
+        # The server may have closed the connection while it was idle
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            connection.rollback()
+        except Database.Error:
+            logger.info('{} pooled connection failed its health check'.format(self.alias))
+            return False
+        return True
+
+    def discard(self, connection):
+        try:
+            connection.close()
+        except Database.Error:
+            pass
+        with self.condition:
+            self.created_at.pop(connection, None)
+            self.counters['discarded'] += 1
+
+    def stats(self):
+        with self.condition:
+            return dict(self.counters, size=self.size, in_use=self.in_use, idle=len(self.idle))
+
+
+def get_pool_stats():
+    '''
+    Returns the stats of the pools of this process, by database alias
+    '''
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {pool.alias: pool.stats() for pool in pools}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_pool(self, conn_params):
+        # Keyed on the parameters as well, since tests switch the database name
+        key = (self.alias, repr(sorted(conn_params.items())))
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                options = self.settings_dict.get('POOL', {})
+                pool = _pools[key] = ConnectionPool(
+                    self.alias,
+                    size=options.get('SIZE', 4),
+                    max_lifetime=options.get('MAX_LIFETIME', 1800),
+                    check_after=options.get('CHECK_AFTER', 10),
+                    timeout=options.get('TIMEOUT', 10),
+                )
+            return pool
+
+    def get_new_connection(self, conn_params):
+        # Connections to the maintenance database are not pooled, they
+        # would keep databases from being created or dropped
+        if self.alias == NO_DB_ALIAS:
+            return super().get_new_connection(conn_params)
+        self.pool = self.get_pool(conn_params)
+        connection = self.pool.checkout(partial(super().get_new_connection, conn_params))
+        # Set by get_new_connection for new connections only
+        self.isolation_level = self.settings_dict['OPTIONS'].get('isolation_level', connection.isolation_level)
+        return connection
+
+    def _close(self):
+        pool = getattr(self, 'pool', None)
+        if self.connection is None or pool is None:
+            return super()._close()
+        # Connections which raised errors other than integrity or data
+        # errors may be unusable, they are not reused
+        pool.checkin(self.connection, broken=self.errors_occurred)
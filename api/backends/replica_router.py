@@ -0,0 +1,45 @@
+from contextvars import ContextVar
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Routing state of the request being handled, set by ReplicaMiddleware.
+# Context variables follow the request into the threads of the async views.
+current_state = ContextVar('replica_state', default=None)
+
+
+class ReplicaState:
+    '''
+    Replica the reads of a request go to (None for the primary),
+    and whether the request wrote to the primary
+    '''
+    __slots__ = ('alias', 'wrote')
+
+    def __init__(self, alias=None):
+        self.alias = alias
+        self.wrote = False
+
+
+class ReplicaRouter:
+    '''
+    Sends the reads of requests ReplicaMiddleware picked a replica for
+    to that replica, everything else to the primary. Reads in a transaction
+    stay on the primary, so that they see the transaction's writes.
+    '''
+
+    def db_for_read(self, model, **hints):
+        state = current_state.get()
+        if state is None or state.alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return state.alias
+
+    def db_for_write(self, model, **hints):
+        state = current_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,27 @@
+from django.contrib.auth import SESSION_KEY
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+
+
+class SessionStore(DBStore):
+    '''
+    Database session store which also records the owner of the session
+    in an indexed column of the `UserSession` table.
+    '''
+
+    @classmethod
+    def get_model_class(cls):
+        from api.models import UserSession
+        return UserSession
+
+    def create_model_instance(self, data):
+        '''
+        Adds the user id (set by the login view or by django auth)
+        to the session row before it is saved
+        '''
+        obj = super().create_model_instance(data)
+        user_id = data.get('user_id', data.get(SESSION_KEY))
+        try:
+            obj.user_id = int(user_id) if user_id is not None else None
+        except (TypeError, ValueError):
+            obj.user_id = None
+        return obj
@@ -0,0 +1,26 @@
+import hashlib
+import os
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+
+
+class HashingFileUploadHandler(TemporaryFileUploadHandler):
+    '''
+    Streams every uploaded file to a temporary file on disk (under
+    FILE_UPLOAD_TEMP_DIR), hashing the chunks as they are written.
+    The sha256 of the file is set as `content_hash` on the uploaded file.
+    '''
+
+    def new_file(self, *args, **kwargs):
+        os.makedirs(settings.FILE_UPLOAD_TEMP_DIR, exist_ok=True)
+        super().new_file(*args, **kwargs)
+        self.hash = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.hash.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        uploaded.content_hash = self.hash.hexdigest()
+        return uploaded
@@ -0,0 +1,100 @@
+from collections import OrderedDict
+from threading import Lock
+import os
+import time
+
+try:
+    # Only importable when running under uwsgi
+    import uwsgi
+except ImportError:
+    uwsgi = None
+
+# Returned by LRUCache.get when the key is not cached, so that
+# None can be cached like any other value
+MISSING = object()
+
+
+class LRUCache:
+    '''
+    Bounded, thread safe, in-process cache.
+    Least recently used entries are evicted once `max_size` is reached,
+    and entries older than `ttl` seconds (if given) are treated as missing.
+    '''
+
+    def __init__(self, max_size, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key, MISSING)
+            if entry is not MISSING:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return MISSING
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        '''
+        Returns the size and hit ratio of the cache
+        '''
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+            }
+
+
+class Generation:
+    '''
+    Changes on every write to some tables. Cache keys include it, so that
+    bumping it invalidates every entry cached before the write. Under uwsgi
+    it is kept in the uwsgi cache `cache_name`, shared by every worker,
+    otherwise in the process.
+    '''
+
+    def __init__(self, key, cache_name=None):
+        self.key = key
+        self.cache_name = cache_name
+        self._value = 0
+        self._lock = Lock()
+
+    def get(self):
+        if uwsgi is not None and self.cache_name:
+            return uwsgi.cache_get(self.key, self.cache_name)
+        return self._value
+
+    def bump(self):
+        if uwsgi is not None and self.cache_name:
+            uwsgi.cache_update(self.key, os.urandom(8), 0, self.cache_name)
+        else:
+            with self._lock:
+                self._value += 1
@@ -0,0 +1,70 @@
+from django.conf import settings
+import gzip
+import re
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Content encodings offered, preferred first
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+ACCEPT_ENCODING = re.compile(r'\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?\s*(?:,|$)')
+
+def choose_encoding(accept_encoding, encodings=ENCODINGS):
+    """
+    Returns the first of `encodings` the Accept-Encoding header accepts, None if none is
+    """
+    accepted = {}
+    for match in ACCEPT_ENCODING.finditer(accept_encoding.lower()):
+        try:
+            accepted[match[1]] = float(match[2]) if match[2] is not None else 1.0
+        except ValueError:
+            continue
+    for encoding in encodings:
+        if accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return None
+
+def compress(content, encoding, best=False):
+    """
+    Compresses the bytes, `best` for content compressed once and sent many times
+    """
+    if encoding == 'br':
+        quality = settings.BROTLI_QUALITY_CACHED if best else settings.BROTLI_QUALITY
+        return brotli.compress(content, quality=quality)
+    level = settings.GZIP_LEVEL_CACHED if best else settings.GZIP_LEVEL
+    # mtime is fixed so that the same content compresses to the same bytes
+    return gzip.compress(content, compresslevel=level, mtime=0)
+
+def precompress(content):
+    """
+    Returns the content compressed with every encoding, by encoding,
+    nothing if it is too small to be worth compressing
+    """
+    if len(content) < settings.COMPRESSION_MIN_SIZE:
+        return {}
+    return {encoding: compress(content, encoding, best=True) for encoding in ENCODINGS}
+
+def compress_stream(chunks, encoding):
+    """
+    Compresses a streamed response chunk by chunk, flushing every chunk
+    so that the client receives the rows as they are read
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=settings.BROTLI_QUALITY)
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+
+    compressor = zlib.compressobj(settings.GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,95 @@
+from contextvars import ContextVar
+from threading import Lock
+import time
+
+# Metrics of the request being handled, set by RequestMetricsMiddleware.
+# Context variables follow the request into threads started with
+# asgiref's sync_to_async, so queries of async views are counted too.
+current_metrics = ContextVar('current_metrics', default=None)
+
+_route_stats = {}
+_route_stats_lock = Lock()
+
+
+class RequestMetrics:
+    '''
+    Time spent by a request in the database and in serialization
+    '''
+    __slots__ = ('queries', 'db_time', 'shapes', 'serialization_time')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        # Number of times each SQL string (with placeholders for params) ran
+        self.shapes = {}
+        self.serialization_time = 0.0
+
+    @property
+    def duplicates(self):
+        '''
+        Queries repeating an earlier one with other params, usually N+1 queries
+        '''
+        return self.queries - len(self.shapes)
+
+
+def record_query(execute, sql, params, many, context):
+    '''
+    Database execute wrapper, installed on every connection
+    '''
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += time.perf_counter() - start
+        metrics.queries += 1
+        metrics.shapes[sql] = metrics.shapes.get(sql, 0) + 1
+
+def add_serialization_time(seconds):
+    metrics = current_metrics.get()
+    if metrics is not None:
+        metrics.serialization_time += seconds
+
+def record_request(route, metrics, total_time):
+    '''
+    Adds the metrics of a request to the stats of its route
+    '''
+    with _route_stats_lock:
+        stats = _route_stats.get(route)
+        if stats is None:
+            stats = _route_stats[route] = {
+                'requests': 0, 'total_time': 0.0, 'max_time': 0.0, 'db_time': 0.0,
+                'queries': 0, 'max_queries': 0, 'duplicates': 0, 'serialization_time': 0.0,
+            }
+        stats['requests'] += 1
+        stats['total_time'] += total_time
+        stats['max_time'] = max(stats['max_time'], total_time)
+        stats['db_time'] += metrics.db_time
+        stats['queries'] += metrics.queries
+        stats['max_queries'] = max(stats['max_queries'], metrics.queries)
+        stats['duplicates'] += metrics.duplicates
+        stats['serialization_time'] += metrics.serialization_time
+
+def get_route_stats():
+    '''
+    Returns the per route averages (times in milliseconds) of this process,
+    each worker process keeps its own
+    '''
+    with _route_stats_lock:
+        stats = {route: dict(values) for route, values in _route_stats.items()}
+    summary = {}
+    for route, values in stats.items():
+        requests = values['requests']
+        summary[route] = {
+            'requests': requests,
+            'mean_ms': values['total_time'] / requests * 1000,
+            'max_ms': values['max_time'] * 1000,
+            'mean_db_ms': values['db_time'] / requests * 1000,
+            'mean_queries': values['queries'] / requests,
+            'max_queries': values['max_queries'],
+            'mean_duplicate_queries': values['duplicates'] / requests,
+            'mean_serialization_ms': values['serialization_time'] / requests * 1000,
+        }
+    return summary
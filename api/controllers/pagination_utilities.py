@@ -0,0 +1,129 @@
+from datetime import datetime
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+import base64
+import binascii
+import json
+
+# Orderings used to page through each table. The last key must be unique
+# so that every row has a distinct position.
+PROJECT_ORDERING = ('-created_at', '-id')
+ID_ORDERING = ('id',)
+# Types of the keys of a cursor, datetimes are sent as strings
+KEY_TYPES = (str, int, float)
+
+
+class InvalidCursor(Exception):
+    '''
+    Raised when the cursor sent by the client cannot be decoded
+    '''
+
+
+def encode_cursor(state):
+    '''
+    Encodes the position of a page into an opaque string
+    '''
+    data = json.dumps(state, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    '''
+    Decodes a cursor created by encode_cursor
+    '''
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        state = json.loads(data)
+    except (binascii.Error, ValueError):
+        raise InvalidCursor(cursor)
+    keys = state.get('keys') if isinstance(state, dict) else None
+    if not isinstance(keys, list) or not all(
+        isinstance(key, KEY_TYPES) and not isinstance(key, bool) for key in keys
+    ):
+        raise InvalidCursor(cursor)
+    return state
+
+def get_cursor(req):
+    '''
+    Returns the decoded `cursor` param of the request, None for the first page
+    '''
+    cursor = req.GET.get('cursor')
+    return decode_cursor(cursor) if cursor else None
+
+def get_page_size(req):
+    '''
+    Returns the `page_size` param of the request, capped to MAX_PAGE_SIZE
+    '''
+    try:
+        page_size = int(req.GET.get('page_size', settings.PAGE_SIZE))
+    except ValueError:
+        return settings.PAGE_SIZE
+    return max(1, min(page_size, settings.MAX_PAGE_SIZE))
+
+def key_value(item, key):
+    '''
+    Returns the value of a key of a row, which can be a model
+    instance, or a row of `values()` or `values_list()`
+    '''
+    value = item[key] if isinstance(item, (dict, tuple)) else getattr(item, key)
+    # Datetimes are sent as strings, which django parses back when filtering
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def keyset_filter(queryset, ordering, values):
+    '''
+    Filters the rows which come after `values` in `ordering`.
+    The first key is also bounded on its own so that the database can seek
+    to the position on an index over the ordering instead of scanning.
+    '''
+    if len(values) != len(ordering):
+        raise InvalidCursor(values)
+
+    keys = [(key.lstrip('-'), key.startswith('-')) for key in ordering]
+    first, descending = keys[0]
+    bound = Q(**{first + ('__lte' if descending else '__gte'): values[0]})
+
+    after = Q()
+    for i, (key, descending) in enumerate(keys):
+        condition = Q(**{key + ('__lt' if descending else '__gt'): values[i]})
+        for j in range(i):
+            condition &= Q(**{keys[j][0]: values[j]})
+        after |= condition
+    try:
+        # Filtering converts the values to the types of the fields
+        return queryset.filter(bound).filter(after)
+    except (ValidationError, TypeError, ValueError, OverflowError):
+        raise InvalidCursor(values)
+
+def paginate(queryset, ordering, cursor=None, page_size=None, state=None, serializer=None):
+    '''
+    Returns a page of `queryset` in `ordering` starting after the cursor,
+    along with the cursor of the next page (None on the last page).
+    With a serializer, the page is read with it and returned as dictionaries.
+    `state` is stored in the next cursor as is.
+    '''
+    page_size = page_size or settings.PAGE_SIZE
+    keys = [key.lstrip('-') for key in ordering]
+    queryset = queryset.order_by(*ordering)
+    if cursor is not None:
+        queryset = keyset_filter(queryset, ordering, cursor['keys'])
+
+    if serializer is not None:
+        extra = [key for key in keys if key not in serializer.columns]
+        columns = serializer.columns + extra
+        queryset = serializer.rows(queryset, extra)
+
+    # One extra row tells if there is a next page
+    items = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_state = dict(state or {})
+        if serializer is not None:
+            next_state['keys'] = [key_value(items[-1], columns.index(key)) for key in keys]
+        else:
+            next_state['keys'] = [key_value(items[-1], key) for key in keys]
+        next_cursor = encode_cursor(next_state)
+
+    if serializer is not None:
+        items = serializer.build_all(items)
+    return items, next_cursor
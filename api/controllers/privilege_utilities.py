@@ -0,0 +1,54 @@
+from django.conf import settings
+from api.controllers.cache_utilities import Generation, LRUCache, MISSING
+from api.models import Project, ProjectMemberRelationship
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Privilege code cached for users who are not members of a project
+NOT_A_MEMBER = 0
+
+# Maps (generation, user_id, project_id) to the user's privilege code in
+# the project. Signals in api.signals bump the generation on every write to
+# memberships or privileges, under uwsgi it is shared by the workers so that
+# none of them serves a revoked privilege.
+privilege_cache = LRUCache(
+    max_size=getattr(settings, 'PRIVILEGE_CACHE_SIZE', 10000),
+    ttl=getattr(settings, 'PRIVILEGE_CACHE_TTL', 60),
+)
+privilege_generation = Generation('privilege-generation', settings.PRIVILEGE_UWSGI_CACHE)
+
+def get_privilege_code(user_id, project_id):
+    """
+    Returns the privilege code of the user in the project, NOT_A_MEMBER if
+    the user is not a member and None if the project does not exist
+    """
+    # Read before the privilege, so that a write in the meantime leaves
+    # the privilege cached under an outdated generation
+    key = (privilege_generation.get(), user_id, project_id)
+    code = privilege_cache.get(key)
+    if code is not MISSING:
+        return code
+
+    code = ProjectMemberRelationship.objects.filter(
+        user_id=user_id, project_id=project_id
+    ).values_list('privilege__code', flat=True).first()
+
+    if code is None:
+        if not Project.objects.filter(id=project_id).exists():
+            # Not cached, the project may be created later
+            return None
+        code = NOT_A_MEMBER
+
+    privilege_cache.set(key, code)
+    return code
+
+def invalidate_all_privileges():
+    """
+    Invalidates every cached privilege, in every worker. Entries of other
+    workers cannot be removed one by one, so any change to memberships drops them all.
+    """
+    privilege_generation.bump()
+    # Entries of older generations are never read again
+    privilege_cache.clear()
+    logger.info('Privilege cache generation bumped')
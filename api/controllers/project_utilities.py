@@ -1,21 +1,163 @@
-from api.models import Project, ProjectMemberPrivilege, ProjectMemberRelationship
+from django.db import connections, IntegrityError, router
+from django.utils import timezone
+from api.controllers.privilege_utilities import invalidate_all_privileges
+from api.controllers.search_utilities import bump_generation
+from api.models import Project, ProjectMemberPrivilege, ProjectMemberRelationship, User
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Resolves everything a new project refers to in one round trip
+RESOLVE_PROJECT_REFERENCES = """
+SELECT
+    (SELECT id FROM api_user WHERE email = %s),
+    (SELECT id FROM api_department WHERE short_name = %s LIMIT 1),
+    (SELECT id FROM api_areaofresearch WHERE name = %s),
+    (SELECT id FROM api_projectmemberprivilege WHERE code = %s LIMIT 1)
+"""
+
+# Inserts the project and its head's admin membership in one statement,
+# which is atomic on its own
+INSERT_PROJECT = """
+WITH project AS (
+    INSERT INTO api_project (created_at, updated_at, name, abstract, paper_link, aor_id, department_id, head_id)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    RETURNING id, head_id
+)
+INSERT INTO api_projectmemberrelationship (project_id, user_id, privilege_id)
+SELECT id, head_id, %s FROM project
+RETURNING project_id
+"""
+
+# Inserts memberships, skipping users who became members since they were
+# checked (added by a concurrent request), and returns the users added
+INSERT_MEMBERS = """
+INSERT INTO api_projectmemberrelationship (project_id, user_id, privilege_id)
+SELECT %s, members.user_id, members.privilege_id
+FROM unnest(%s::bigint[], %s::bigint[]) AS members (user_id, privilege_id)
+ON CONFLICT ON CONSTRAINT unique_project_member DO NOTHING
+RETURNING user_id
+"""
+
+# Relations the project endpoints expand (`expand` query param), with the
+# serializer expansions they need. Members always come with their user.
+PROJECT_EXPANSIONS = {
+    'head': ('head',),
+    'aor': ('aor',),
+    'department': ('department',),
+    'members': ('members.user',),
+    'members.privilege': ('members.user', 'members.privilege'),
+}
+
+# Messages of the unique constraints a new project can violate
+CONSTRAINT_ERRORS = {
+    'unique_project_name': "A project with the same name exists! Please switch to a new project name",
+    'unique_project_paper_link': "Google scholar's link already exists",
+}
+
+def constraint_error(error):
+    """
+        Returns the message of the unique constraint an IntegrityError
+        violated, None if it is not in CONSTRAINT_ERRORS
+    """
+    constraint = getattr(getattr(error.__cause__, 'diag', None), 'constraint_name', None)
+    return CONSTRAINT_ERRORS.get(constraint)
+
+def get_project_expand(req):
+    """
+        Returns the serializer expansions of the comma separated `expand`
+        query param, raises ValueError on relations which cannot be expanded
+    """
+    expand = set()
+    for name in filter(None, (name.strip() for name in req.GET.get("expand", "").split(","))):
+        if name not in PROJECT_EXPANSIONS:
+            raise ValueError(name)
+        expand.update(PROJECT_EXPANSIONS[name])
+    return tuple(sorted(expand))
+
 def create_project(name, abstract, paper_link, head, department, aor):
     """
-        Helper to create project and assign project user relationship
+        Helper to create project and assign project user relationship.
+        `head` is the email of the head, `department` the short name of
+        the department and `aor` the name of the area of research.
+        Returns the id of the project and None, or None and an error message.
     """
-    try:
-        project_member_privilege = ProjectMemberPrivilege.objects.filter(name = "Admin")
-        if project_member_privilege.exists():
-            project = Project.objects.create(name = name, abstract = abstract, paper_link = paper_link, head = head, department = department, aor = aor)
-            ProjectMemberRelationship.objects.create(project = project, user = head, privilege = project_member_privilege[0])
-            return True
-        else:
+    # Goes through the router, so that the client is pinned to the primary
+    with connections[router.db_for_write(Project)].cursor() as cursor:
+        cursor.execute(RESOLVE_PROJECT_REFERENCES, [
+            head, department, aor, ProjectMemberPrivilege.AvailablePrivileges.ADMIN,
+        ])
+        head_id, department_id, aor_id, privilege_id = cursor.fetchone()
+
+        if head_id is None:
+            return None, "User does not exist"
+        if department_id is None:
+            return None, "Department doesn't exist"
+        if aor_id is None:
+            return None, "Please select from the given areas of research"
+        if privilege_id is None:
             logger.error("Admin access not found")
-            return False
-    except Exception as e:
-        logger.error(e)
-        return False
+            return None, "Invalid details"
+
+        now = timezone.now()
+        try:
+            cursor.execute(INSERT_PROJECT, [
+                now, now, name, abstract, paper_link, aor_id, department_id, head_id, privilege_id,
+            ])
+        except IntegrityError as e:
+            error = constraint_error(e)
+            if error is not None:
+                return None, error
+            raise
+        project_id, = cursor.fetchone()
+    # Raw inserts send no post_save signal
+    bump_generation()
+    return project_id, None
+
+def get_privileges():
+    """
+        Returns the privileges by code
+    """
+    return {privilege.code: privilege for privilege in ProjectMemberPrivilege.objects.all()}
+
+def add_members(project_id, members):
+    """
+        Adds (email, privilege code) pairs as members of the project, in a
+        constant number of queries. Returns the outcome of every pair.
+    """
+    emails = {email for email, _ in members}
+    users = dict(User.objects.filter(email__in=emails).values_list('email', 'id'))
+    existing = set(ProjectMemberRelationship.objects.filter(
+        project_id=project_id, user_id__in=users.values()
+    ).values_list('user_id', flat=True))
+    privileges = get_privileges()
+
+    outcomes = []
+    added = {}
+    for email, code in members:
+        user_id = users.get(email)
+        if user_id is None:
+            status = "User does not exist"
+        elif code not in privileges or code == ProjectMemberPrivilege.AvailablePrivileges.ADMIN:
+            status = "Invalid privilege"
+        elif user_id in existing:
+            status = "Already a member"
+        else:
+            status = "Added"
+            existing.add(user_id)
+            added[user_id] = privileges[code].id
+        outcomes.append({'email': email, 'privilege': code, 'status': status})
+
+    if added:
+        with connections[router.db_for_write(ProjectMemberRelationship)].cursor() as cursor:
+            cursor.execute(INSERT_MEMBERS, [project_id, list(added), list(added.values())])
+            inserted = {user_id for user_id, in cursor.fetchall()}
+        # Members added by a concurrent request in the meantime
+        for outcome in outcomes:
+            if outcome['status'] == "Added" and users[outcome['email']] not in inserted:
+                outcome['status'] = "Already a member"
+        # Raw inserts send no signals
+        if inserted:
+            invalidate_all_privileges()
+        logger.info('Project(pk={}) {} members added'.format(project_id, len(inserted)))
+    return outcomes
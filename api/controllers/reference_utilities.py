@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from django.utils.http import parse_etags, quote_etag
+from api.controllers.cache_utilities import Generation, LRUCache, MISSING
+from api.controllers.compression_utilities import precompress
+from api.decorators.response import regularize_response
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Encoded responses of the reference data endpoints (departments, areas of
+# research, centers), keyed on the table's version. Versions are bumped by
+# signals in api.signals and shared by the workers under uwsgi, the ttl
+# bounds how long other worker processes can serve a stale response otherwise.
+reference_cache = LRUCache(
+    max_size=getattr(settings, 'REFERENCE_CACHE_SIZE', 256),
+    ttl=getattr(settings, 'REFERENCE_CACHE_TTL', 300),
+)
+
+# Generation of each table, by model label
+_versions = {}
+
+def _version(model):
+    label = model._meta.label
+    if label not in _versions:
+        _versions.setdefault(label, Generation('reference-version:' + label, settings.REFERENCE_UWSGI_CACHE))
+    return _versions[label]
+
+def get_version(model):
+    return _version(model).get()
+
+def bump_version(model):
+    """
+    Invalidates every cached response of the model's table
+    """
+    _version(model).bump()
+    logger.info('{} reference cache version bumped'.format(model._meta.label))
+
+def cached_response(req, model, key, build):
+    """
+    Returns the cached response of the model's table for `key`,
+    otherwise builds the response data with `build()` and caches it
+    encoded, so that hits are served without touching the database
+    or encoding JSON again. Error responses are not cached.
+    The ETag of the content is cached along with it, so clients
+    holding the same content get a 304, and so is the content compressed
+    with every encoding, which CompressionMiddleware sends as it is.
+    """
+    cache_key = (model._meta.label, get_version(model)) + tuple(key)
+    entry = reference_cache.get(cache_key)
+    if entry is MISSING:
+        response = regularize_response(build())
+        if response['status_code'] != 200:
+            return response
+        content = JsonResponse(response).content
+        entry = (content, quote_etag(hashlib.md5(content).hexdigest()), precompress(content))
+        reference_cache.set(cache_key, entry)
+
+    content, etag, compressed = entry
+    # Compressed responses carry the ETag weakened, which clients send back
+    etags = [tag[2:] if tag.startswith('W/') else tag for tag in parse_etags(req.META.get('HTTP_IF_NONE_MATCH', ''))]
+    if etag in etags or '*' in etags:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(content, content_type='application/json')
+        response.precompressed = compressed
+    response['ETag'] = etag
+    return response
@@ -0,0 +1,268 @@
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db import connections, router
+from django.db.models import F, FloatField, Func, Q, Value
+from django.db.models.functions import Cast, Greatest
+from api.controllers.cache_utilities import Generation, LRUCache, MISSING
+from api.controllers.pagination_utilities import paginate
+from api.controllers.serializer_utilities import get_serializer
+from api.models import AreaOfResearch, Project, Unaccent, User
+import json
+import logging
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+# Ranks are cast to double precision so that they survive
+# the round trip through the page cursor unchanged
+SEARCH_ORDERING = ('-rank', '-created_at', '-id')
+
+# Query params narrowing the search, by the column they filter on.
+# Foreign key columns, which are indexed.
+FACET_FILTERS = {
+    'department': 'department_id',
+    'aor': 'aor_id',
+    'head': 'head_id',
+}
+
+# Counts the matched projects per department, area of research and head,
+# and in total, in one scan of the matches
+FACET_COUNTS = """
+SELECT facets.department_id, department.short_name, facets.aor_id, aor.name,
+       facets.head_id, head.name, facets.count
+FROM (
+    SELECT matched.department_id, matched.aor_id, matched.head_id, COUNT(*) AS count
+    FROM ({matched}) matched
+    GROUP BY GROUPING SETS ((matched.department_id), (matched.aor_id), (matched.head_id), ())
+) facets
+LEFT JOIN api_department department ON department.id = facets.department_id
+LEFT JOIN api_areaofresearch aor ON aor.id = facets.aor_id
+LEFT JOIN api_user head ON head.id = facets.head_id
+ORDER BY facets.count DESC, facets.department_id, facets.aor_id, facets.head_id
+"""
+
+# Names of each kind containing what was typed, nearest words first, with
+# their accents removed. Both the ILIKE and the ordering on word distance
+# are answered by the GiST trigram indexes on the unaccented names, whose
+# scans stop after `limit` rows.
+SUGGEST = """
+(SELECT 'project', id, name, api_unaccent(%(query)s) <<-> api_unaccent(name) FROM api_project
+ WHERE api_unaccent(name) ILIKE api_unaccent(%(pattern)s)
+ ORDER BY api_unaccent(%(query)s) <<-> api_unaccent(name) LIMIT %(limit)s)
+UNION ALL
+(SELECT 'aor', id, name, api_unaccent(%(query)s) <<-> api_unaccent(name) FROM api_areaofresearch
+ WHERE api_unaccent(name) ILIKE api_unaccent(%(pattern)s)
+ ORDER BY api_unaccent(%(query)s) <<-> api_unaccent(name) LIMIT %(limit)s)
+UNION ALL
+(SELECT 'researcher', id, name, api_unaccent(%(query)s) <<-> api_unaccent(name) FROM api_user
+ WHERE api_unaccent(name) ILIKE api_unaccent(%(pattern)s) AND is_staff
+ ORDER BY api_unaccent(%(query)s) <<-> api_unaccent(name) LIMIT %(limit)s)
+ORDER BY 4, 3
+LIMIT %(limit)s
+"""
+
+# Suggestions of recent prefixes, typed by many users one keystroke at a time,
+# keyed on the generation of the searched tables like the search results
+suggest_cache = LRUCache(
+    max_size=getattr(settings, 'SUGGEST_CACHE_SIZE', 4096),
+    ttl=getattr(settings, 'SUGGEST_CACHE_TTL', 60),
+)
+
+# Results of recent searches, keyed on the generation of the searched
+# tables. Popular searches are served without running them again.
+search_cache = LRUCache(
+    max_size=getattr(settings, 'SEARCH_CACHE_SIZE', 2048),
+    ttl=getattr(settings, 'SEARCH_CACHE_TTL', 300),
+)
+
+# Facets of recent searches, keyed on the generation like the results,
+# so that later pages and other page sizes do not count them again
+facet_cache = LRUCache(
+    max_size=getattr(settings, 'FACET_CACHE_SIZE', 1024),
+    ttl=getattr(settings, 'FACET_CACHE_TTL', 60),
+)
+
+def full_text_search(query):
+    """
+    Returns projects matching the query on the search vector,
+    most relevant first
+    """
+    search_query = SearchQuery(
+        Func(Value(query), function='unaccent'),
+        config=settings.SEARCH_CONFIG,
+        search_type='websearch',
+    )
+    return Project.objects.filter(search_vector=search_query).annotate(
+        rank=Cast(SearchRank(F('search_vector'), search_query), FloatField())
+    )
+
+def trigram_search(query):
+    """
+    Returns projects whose name, head's name or area of research is
+    similar to the query, used when the query has typos. Names are
+    compared without their accents, on the unaccented name indexes.
+    """
+    query = Unaccent(Value(query))
+    # Each name is matched in a subquery of its own, answered by its index
+    similar = {
+        model: model.objects.alias(unaccented_name=Unaccent('name')).filter(
+            unaccented_name__trigram_similar=query,
+        ).values('id')
+        for model in (Project, User, AreaOfResearch)
+    }
+    return Project.objects.filter(
+        Q(id__in=similar[Project])
+        | Q(head__in=similar[User])
+        | Q(aor__in=similar[AreaOfResearch])
+    ).annotate(
+        rank=Cast(Greatest(
+            TrigramSimilarity(Unaccent('name'), query),
+            TrigramSimilarity(Unaccent('head__name'), query),
+            TrigramSimilarity(Unaccent('aor__name'), query),
+        ), FloatField())
+    )
+
+def get_facet_filters(req):
+    """
+    Returns the facet filters of the request as {column: id},
+    raises ValueError if an id is not a number
+    """
+    return {
+        column: int(req.GET[param])
+        for param, column in FACET_FILTERS.items()
+        if req.GET.get(param)
+    }
+
+# Generation of the searched tables (projects, users, areas of research
+# and departments), shared by the workers under uwsgi
+search_generation = Generation('search-generation', settings.SEARCH_UWSGI_CACHE)
+
+def get_generation():
+    """
+    Returns the generation of the searched tables, which changes on every write to them
+    """
+    return search_generation.get()
+
+def bump_generation():
+    """
+    Invalidates every cached search result and facet count
+    """
+    search_generation.bump()
+
+def normalize_query(query):
+    """
+    Case folds the query, strips its accents and collapses its whitespace,
+    which changes none of the matches: every search and suggestion compares
+    unaccented names, and unaccents the query again in SQL for the letters
+    (eg. ø) which have no combining accent.
+    """
+    query = ''.join(
+        char for char in unicodedata.normalize('NFKD', query.casefold())
+        if not unicodedata.combining(char)
+    )
+    return ' '.join(query.split())
+
+def facet_counts(projects):
+    """
+    Returns the number of projects per department, area of research
+    and head (the FACET_LIMIT largest of each), and the total
+    """
+    matched = projects.order_by().values('department_id', 'aor_id', 'head_id')
+    sql, params = matched.query.get_compiler(using=matched.db).as_sql()
+    limit = getattr(settings, 'FACET_LIMIT', 20)
+
+    facets = {'total': 0, 'department': [], 'aor': [], 'head': []}
+    with connections[matched.db].cursor() as cursor:
+        cursor.execute(FACET_COUNTS.format(matched=sql), params)
+        for department_id, department, aor_id, aor, head_id, head, count in cursor.fetchall():
+            if department_id is not None:
+                key, value = 'department', {'id': department_id, 'name': department, 'count': count}
+            elif aor_id is not None:
+                key, value = 'aor', {'id': aor_id, 'name': aor, 'count': count}
+            elif head_id is not None:
+                key, value = 'head', {'id': head_id, 'name': head, 'count': count}
+            else:
+                facets['total'] = count
+                continue
+            if len(facets[key]) < limit:
+                facets[key].append(value)
+    return facets
+
+def get_facets(query, mode, filters, matches):
+    """
+    Returns the facet counts of the matches, cached by query and filters
+    """
+    key = (get_generation(), query, mode, tuple(sorted(filters.items())))
+    facets = facet_cache.get(key)
+    if facets is MISSING:
+        facets = facet_counts(matches)
+        facet_cache.set(key, facets)
+    return facets
+
+def search_projects(query, cursor=None, page_size=None, filters=None, facets=False):
+    """
+    Returns a page of serialized projects matching the query by relevance, the
+    cursor of the next page, and the facet counts of all the matches if `facets`.
+    `filters` ({column: id}, see get_facet_filters) narrow the matches.
+    Pages are cached on the normalized query until the next write to the
+    searched tables.
+    """
+    query = normalize_query(query)
+    filters = filters or {}
+    key = (
+        get_generation(), query, json.dumps(cursor, sort_keys=True), page_size,
+        tuple(sorted(filters.items())), facets,
+    )
+    result = search_cache.get(key)
+    if result is MISSING:
+        result = run_search(query, cursor, page_size, filters, facets)
+        search_cache.set(key, result)
+    return result
+
+def run_search(query, cursor, page_size, filters, facets):
+    """
+    Runs the search of search_projects. Falls back to trigram similarity
+    when the full text search has no matches, the cursor remembers
+    which one is used.
+    """
+    serializer = get_serializer(Project)
+    mode = cursor.get('mode') if cursor else None
+    if mode != 'trigram':
+        matches = full_text_search(query).filter(**filters)
+        projects, next_cursor = paginate(
+            matches, SEARCH_ORDERING, cursor, page_size,
+            state={'mode': 'fts'}, serializer=serializer,
+        )
+        if projects or mode == 'fts':
+            return projects, next_cursor, get_facets(query, 'fts', filters, matches) if facets else None
+        logger.info('Search(query={}) No full text matches, using trigram search'.format(query))
+    matches = trigram_search(query).filter(**filters)
+    projects, next_cursor = paginate(
+        matches, SEARCH_ORDERING, cursor, page_size,
+        state={'mode': 'trigram'}, serializer=serializer,
+    )
+    return projects, next_cursor, get_facets(query, 'trigram', filters, matches) if facets else None
+
+def suggest(query, limit):
+    """
+    Returns up to `limit` projects, areas of research and researchers
+    whose names contain the query, closest matches first
+    """
+    query = normalize_query(query)
+    key = (get_generation(), query, limit)
+    suggestions = suggest_cache.get(key)
+    if suggestions is MISSING:
+        alias = router.db_for_read(Project)
+        connection = connections[alias]
+        with connection.cursor() as cursor:
+            cursor.execute(SUGGEST, {
+                'query': query,
+                'pattern': '%{}%'.format(connection.ops.prep_for_like_query(query)),
+                'limit': limit,
+            })
+            suggestions = [
+                {'type': kind, 'id': id, 'name': name}
+                for kind, id, name, _ in cursor.fetchall()
+            ]
+        suggest_cache.set(key, suggestions)
+    return suggestions
@@ -0,0 +1,168 @@
+from functools import lru_cache
+from itertools import islice
+
+# Only fields sent to clients of these models, by model label. Users are
+# expanded on public endpoints, their email and flags are never sent.
+PUBLIC_FIELDS = {
+    'api.User': {'id', 'name', 'image'},
+}
+
+
+class RowSerializer:
+    '''
+    Serializes rows of a model into dictionaries straight from
+    `values_list()`, without building model instances.
+
+    The output matches `model_to_dict`: every editable concrete field,
+    with foreign keys as ids, limited to PUBLIC_FIELDS for the models listed. Foreign keys named in `expand` (dotted for
+    deeper relations, eg. "aor.department") are replaced by a dictionary
+    of the related row, read in the same query through a join.
+    One to many relations of the model named in `expand` (eg. "members",
+    "members.user") are added as lists, read for all the rows at once
+    with one more query per relation.
+    '''
+
+    def __init__(self, model, expand=()):
+        self.model = model
+        self.columns = []
+        # (key, column of the foreign key to the model, serializer) of the expanded one to many relations
+        self.many = []
+        self.spec = self.compile(model, '', expand_tree(expand))
+        self.keys = [key for key, _ in self.spec]
+        self.nested = any(not isinstance(sub, int) for _, sub in self.spec)
+        if self.many and model._meta.pk.attname not in self.columns:
+            # Last, after the columns of the keys
+            self.columns.append(model._meta.pk.attname)
+        self.pk_index = self.columns.index(model._meta.pk.attname) if self.many else None
+
+    def compile(self, model, prefix, tree):
+        '''
+        Returns a list of (key, index of column) pairs for the fields of the
+        model. Expanded relations have (key, (index of the related primary
+        key, nested list)) instead.
+        '''
+        spec = []
+        public = PUBLIC_FIELDS.get(model._meta.label)
+        for field in model._meta.concrete_fields:
+            if not field.editable or (public is not None and field.name not in public):
+                continue
+            if field.is_relation and field.name in tree:
+                related = field.related_model
+                related_prefix = prefix + field.name + '__'
+                nested = self.compile(related, related_prefix, tree[field.name])
+                # The related primary key tells apart null relations
+                pk_column = related_prefix + related._meta.pk.attname
+                if pk_column not in self.columns:
+                    self.columns.append(pk_column)
+                spec.append((field.name, (self.columns.index(pk_column), nested)))
+                continue
+            self.columns.append(prefix + (field.name if field.is_relation else field.attname))
+            spec.append((field.name, len(self.columns) - 1))
+
+        expanded = {key for key, sub in spec if not isinstance(sub, int)}
+        if not prefix:
+            for relation in model._meta.related_objects:
+                name = relation.get_accessor_name()
+                if relation.one_to_many and name in tree:
+                    serializer = get_serializer(relation.related_model, tuple(sorted(tree_paths(tree[name]))))
+                    self.many.append((name, relation.field.attname, serializer))
+                    expanded.add(name)
+
+        unknown = set(tree) - expanded
+        if unknown:
+            raise ValueError('Cannot expand {} on {}'.format(', '.join(sorted(unknown)), model.__name__))
+        return spec
+
+    def rows(self, queryset, extra=()):
+        '''
+        Returns `queryset` as tuples of the serialized columns
+        followed by the `extra` columns
+        '''
+        return queryset.values_list(*self.columns, *extra)
+
+    def build(self, row):
+        if not self.nested:
+            # Columns are in the order of the keys, extra columns at the end are dropped
+            return dict(zip(self.keys, row))
+        return build_nested(self.spec, row)
+
+    def build_all(self, rows):
+        '''
+        Builds the rows, with the expanded one to many relations
+        of all of them read in one query per relation
+        '''
+        items = [self.build(row) for row in rows]
+        if not self.many or not items:
+            return items
+        ids = [row[self.pk_index] for row in rows]
+        for key, attname, serializer in self.many:
+            related = {}
+            queryset = serializer.model.objects.filter(**{attname + '__in': ids}).order_by('pk')
+            for row in serializer.rows(queryset, (attname,)):
+                related.setdefault(row[-1], []).append(serializer.build(row))
+            for item, id in zip(items, ids):
+                item[key] = related.get(id, [])
+        return items
+
+    def serialize(self, queryset):
+        '''
+        Returns the rows of the queryset as a list of dictionaries
+        '''
+        return self.build_all(list(self.rows(queryset)))
+
+    def iterate(self, queryset, chunk_size):
+        '''
+        Yields the rows of the queryset one by one, reading them through
+        a server side cursor
+        '''
+        rows = self.rows(queryset).iterator(chunk_size=chunk_size)
+        if not self.many:
+            for row in rows:
+                yield self.build(row)
+            return
+        # One to many relations are read a chunk of rows at a time
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield from self.build_all(chunk)
+
+
+def expand_tree(expand):
+    '''
+    Converts dotted relation names into a nested dictionary,
+    eg. ["aor.department", "head"] to {"aor": {"department": {}}, "head": {}}
+    '''
+    tree = {}
+    for path in expand:
+        node = tree
+        for name in path.split('.'):
+            node = node.setdefault(name, {})
+    return tree
+
+def tree_paths(tree, prefix=''):
+    '''
+    Converts a nested dictionary of relations back into dotted names
+    '''
+    for name, subtree in tree.items():
+        if subtree:
+            yield from tree_paths(subtree, prefix + name + '.')
+        else:
+            yield prefix + name
+
+def build_nested(spec, row):
+    data = {}
+    for key, sub in spec:
+        if isinstance(sub, int):
+            data[key] = row[sub]
+        else:
+            pk_index, nested = sub
+            data[key] = None if row[pk_index] is None else build_nested(nested, row)
+    return data
+
+@lru_cache(maxsize=None)
+def get_serializer(model, expand=()):
+    '''
+    Returns the serializer of the model, built once per model and expansion
+    '''
+    return RowSerializer(model, expand)
@@ -0,0 +1,75 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from PIL import Image
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Pillow format of the images accepted, by extension
+IMAGE_FORMATS = {'.jpg': 'JPEG', '.jpeg': 'JPEG', '.png': 'PNG', '.gif': 'GIF', '.webp': 'WEBP'}
+
+# Resized variants are created off the request thread
+variant_executor = ThreadPoolExecutor(max_workers=settings.IMAGE_VARIANT_WORKERS)
+
+def is_image(uploaded):
+    """
+    Checks that the uploaded file is an image of the format its extension
+    tells, which is the content type it is served with
+    """
+    image_format = IMAGE_FORMATS.get(os.path.splitext(uploaded.name)[1].lower())
+    if image_format is None:
+        return False
+    try:
+        # Reads the headers and checks the file's structure, without decoding the pixels
+        with Image.open(uploaded) as image:
+            image.verify()
+            return image.format == image_format
+    except Exception as e:
+        # Pillow raises errors of many types on broken files
+        logger.info('Image(name={}) Invalid image: {}'.format(uploaded.name, e))
+        return False
+    finally:
+        uploaded.seek(0)
+
+def variant_name(name, size):
+    base, ext = os.path.splitext(name)
+    return '{}_{}{}'.format(base, size, ext)
+
+def store_image(uploaded):
+    """
+    Moves an uploaded image from its temporary file to a path derived from
+    its content hash and returns the path relative to MEDIA_ROOT.
+    Identical images are stored once.
+    """
+    ext = os.path.splitext(uploaded.name)[1].lower()
+    name = 'images/{}/{}{}'.format(uploaded.content_hash[:2], uploaded.content_hash, ext)
+    path = os.path.join(settings.MEDIA_ROOT, name)
+
+    if os.path.exists(path):
+        logger.info('Image(name={}) Already stored'.format(name))
+        return name
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Rename within MEDIA_ROOT, the file is never copied
+    os.replace(uploaded.temporary_file_path(), path)
+    os.chmod(path, settings.FILE_UPLOAD_PERMISSIONS)
+    variant_executor.submit(create_variants, path)
+    logger.info('Image(name={}) Stored'.format(name))
+    return name
+
+def create_variants(path):
+    """
+    Creates the resized variants of an image next to it
+    """
+    try:
+        with Image.open(path) as image:
+            for size in settings.IMAGE_VARIANT_SIZES:
+                variant = image.copy()
+                variant.thumbnail((size, size))
+                variant_path = variant_name(path, size)
+                tmp_path = variant_path + '.tmp'
+                variant.save(tmp_path, format=image.format)
+                os.replace(tmp_path, variant_path)
+    except Exception as e:
+        logger.error('Image(path={}) Creating variants failed: {}'.format(path, e))
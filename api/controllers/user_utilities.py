@@ -1,7 +1,6 @@
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email as _validate_email
-from django.contrib.sessions.models import Session
-from api.models import User
+from api.models import User, UserSession
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,13 +12,13 @@ def validate_email(email):
     except ValidationError:
         return False
 
-def register_user(email, name, password, is_staff, uploaded_file_url):
+def register_user(email, name, password, is_staff, image):
     
     user = User.objects.create_user(email=email,
                                     name=name,
                                     password=password,
                                     is_staff=is_staff,
-                                    image=uploaded_file_url,
+                                    image=image,
                                     is_verified=1)
     user.save()
 
@@ -30,13 +29,7 @@ def remove_existing_sessions(user_id):
     """
     Removes sessions on other devices for the giver user_id
     """
-    sessions = Session.objects.all()
-
-    for session in sessions:
-        data = session.get_decoded()
-        if data.get('user_id', -1) == user_id:
-            # Already a session exist, delete it
-            session.delete()
+    UserSession.objects.filter(user_id=user_id).delete()
     logger.info('User(pk={}) Existing sessions deleted'.format(user_id))
     return
 
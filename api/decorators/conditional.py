@@ -0,0 +1,48 @@
+import hashlib
+from django.db.models import Count, Max, Sum
+from django.views.decorators.http import condition
+from api.controllers.pagination_utilities import get_cursor, get_page_size, keyset_filter, InvalidCursor
+
+def page_etag(req, queryset, ordering, paginated):
+    '''
+    Returns the ETag of the rows a request reads, from the count, sum of
+    ids and latest `updated_at` of those rows. These are computed by a
+    single aggregate over the page, without fetching the rows.
+    '''
+    if req.GET.get('expand'):
+        # Expanded pages show rows of other tables, whose changes
+        # the ETag of the page would miss
+        return None
+
+    rows = queryset.order_by(*ordering)
+    key = ''
+    try:
+        if paginated:
+            cursor = get_cursor(req)
+            page_size = get_page_size(req)
+            if cursor is not None:
+                rows = keyset_filter(rows, ordering, cursor['keys'])
+            rows = rows[:page_size + 1]
+            key = '{}:{}'.format(req.GET.get('cursor', ''), page_size)
+        stats = rows.aggregate(count=Count('id'), ids=Sum('id'), last_modified=Max('updated_at'))
+    except InvalidCursor:
+        # No ETag, the view responds with the error
+        return None
+
+    return hashlib.md5('{}:{}:{}:{}'.format(
+        stats['count'], stats['ids'], stats['last_modified'], key
+    ).encode()).hexdigest()
+
+def ConditionalPageDec(get_queryset, ordering, paginated=True):
+    '''
+    Answers conditional GETs with a 304 when the rows of the page did not
+    change, before the view runs. `get_queryset` returns the rows of a
+    TimestampedModel the view lists in `ordering`.
+    No Last-Modified is sent: the latest `updated_at` of a page does not
+    change when one of its rows is deleted or an older row moves into it.
+    '''
+
+    def etag(req, *args, **kwargs):
+        return page_etag(req, get_queryset(), ordering, paginated)
+
+    return condition(etag_func=etag)
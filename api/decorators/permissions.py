@@ -1,7 +1,6 @@
 import logging
-from django.contrib.sessions.models import Session
 from api.controllers.response_format import unauthorized_response, error_response
-from api.models import User, Project, ProjectMemberRelationship, ProjectMemberPrivilege
+from api.controllers.privilege_utilities import get_privilege_code, NOT_A_MEMBER
 from django.http import HttpRequest
 logger = logging.getLogger('django')
 
@@ -14,15 +13,9 @@ def IsStaffDec(view):
         try:
             request = args[0]
             assert isinstance(request, HttpRequest)
-            user_id = request.session.get('user_id')
-            session_key = request.session.session_key
-            user_session = Session.objects.get(pk=session_key)
-            assert user_session.get_decoded().get('user_id') == user_id
-            user = request.user
-            if user.is_staff:
-                request.is_staff = True
-            else:
-                request.is_staff = False
+            auth_context = request.auth_context
+            assert auth_context.is_authenticated
+            request.is_staff = auth_context.is_staff
         except Exception as e:
             logger.info('IsStaff Decorator: Unauthorized response')
             return unauthorized_response()
@@ -31,31 +24,27 @@ def IsStaffDec(view):
 
 def CheckAccessPrivilegeDec(view):
     '''
-    Checks the Access Privilege and puts it in request.
+    Checks the Access Privilege and puts its code in request.
     '''
 
     def wrapper(*args, **kwargs):
         try:
             request = args[0]
             assert isinstance(request, HttpRequest)
-            user_id = request.session.get('user_id')
-            session_key = request.session.session_key
-            user_session = Session.objects.get(pk=session_key)
-            assert user_session.get_decoded().get('user_id') == user_id
-            user = request.user
+            auth_context = request.auth_context
+            assert auth_context.is_authenticated
             project_id = request.POST.get("projectId")
-
-            try:
-                project = Project.objects.get(id=project_id)
-            except Project.DoesNotExist:
+            if project_id is None:
                 return error_response("Project does not exist")
 
-            try:
-                project_member_relationship = ProjectMemberRelationship.objects.get(user=user,project=project)
-            except ProjectMemberRelationship.DoesNotExist:
+            privilege_code = get_privilege_code(auth_context.user_id, int(project_id))
+            if privilege_code is None:
+                return error_response("Project does not exist")
+            if privilege_code == NOT_A_MEMBER:
                 return error_response("User is not a member of the project")
 
-            request.access_privilege = project_member_relationship.privilege.name
+            # One of ProjectMemberPrivilege.AvailablePrivileges
+            request.access_privilege = privilege_code
 
         except Exception as e:
             logger.info('CheckAccessPrivilege Decorator: Unauthorized response')
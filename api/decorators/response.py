@@ -1,7 +1,14 @@
 import logging
+import time
+from types import GeneratorType
 
-from django.http import JsonResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+from django.http import JsonResponse, StreamingHttpResponse
+from django.http.response import HttpResponseBase
 from django.conf import settings
+from api.controllers.metrics_utilities import add_serialization_time
+from api.controllers.serializer_utilities import get_serializer
 
 logger = logging.getLogger('django')
 
@@ -50,9 +57,45 @@ def regularize_response(response):
 
     return response
 
+def stream_rows(rows):
+    '''
+    Yields the JSON Response format around the rows, a few rows at a time,
+    so that the rows never have to be held in memory together
+    '''
+    encoder = DjangoJSONEncoder()
+    buffer = ['{"data": [']
+    size = 0
+    separator = ''
+    try:
+        for row in rows:
+            chunk = separator + encoder.encode(row)
+            separator = ', '
+            buffer.append(chunk)
+            size += len(chunk)
+            if size >= settings.STREAM_BUFFER_SIZE:
+                yield ''.join(buffer)
+                buffer = []
+                size = 0
+    except Exception as e:
+        # The status line is already sent, so the response is cut short
+        logger.exception("JsonResponseDecorator: Streaming failed: {}".format(e))
+        raise
+    buffer.append('], "status_code": 200}')
+    yield ''.join(buffer)
+
+def streaming_response(rows):
+    '''
+    Streams a QuerySet (read through a server side cursor) or a generator of rows
+    '''
+    if isinstance(rows, QuerySet):
+        rows = get_serializer(rows.model).iterate(rows, settings.STREAM_CHUNK_SIZE)
+    return StreamingHttpResponse(stream_rows(rows), content_type='application/json')
+
 def JsonResponseDec(view):
     '''
     Converts any data returned by a function into a JSON Response format.
+    Views returning a QuerySet or a generator get a streamed response,
+    responses which are already built are returned as they are.
     '''
 
     def wrapper(*args, **kwargs):
@@ -63,7 +106,15 @@ def JsonResponseDec(view):
             logger.error("JsonResponseDecorator: {}".format(e))
             response = exception_response(e)
 
-        response = regularize_response(response)
-        return JsonResponse(response)
+        if isinstance(response, HttpResponseBase):
+            return response
+
+        if isinstance(response, (QuerySet, GeneratorType)):
+            return streaming_response(response)
+
+        start = time.perf_counter()
+        response = JsonResponse(regularize_response(response))
+        add_serialization_time(time.perf_counter() - start)
+        return response
     # logger.info('JsonResponseDecorator: Successful')
     return wrapper
@@ -0,0 +1,17 @@
+'''
+Helpers shared by the benchmark commands
+'''
+
+
+class Rollback(Exception):
+    '''
+    Raised inside a transaction to undo the seeded rows once a benchmark
+    (or a round of it) is done
+    '''
+
+
+def percentile(timings, fraction):
+    '''
+    Returns the timing below which `fraction` of the sorted `timings` fall
+    '''
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))]
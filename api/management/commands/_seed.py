@@ -0,0 +1,149 @@
+'''
+Synthetic data used by the benchmark commands
+'''
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.utils.crypto import get_random_string
+from django.utils.text import slugify
+
+from api.models import (
+    AreaOfResearch, Department, Labs, Project, ProjectMemberPrivilege,
+    ProjectMemberRelationship, User,
+)
+
+BATCH_SIZE = 5000
+
+FIRST_NAMES = [
+    'Arun', 'Priya', 'Karthik', 'Lakshmi', 'Suresh', 'Divya', 'Ramesh', 'Anitha',
+    'Vijay', 'Meena', 'Rajesh', 'Kavya', 'Ganesh', 'Shruthi', 'Mohan', 'Deepa',
+]
+LAST_NAMES = [
+    'Kumar', 'Raman', 'Iyer', 'Subramanian', 'Krishnan', 'Natarajan', 'Pillai',
+    'Venkatesh', 'Srinivasan', 'Balaji', 'Chandran', 'Mahesh', 'Rao', 'Nair',
+]
+TOPICS = [
+    'machine', 'learning', 'network', 'security', 'distributed', 'systems',
+    'robotics', 'control', 'signal', 'processing', 'power', 'electronics',
+    'materials', 'composite', 'thermal', 'fluid', 'dynamics', 'catalysis',
+    'polymer', 'structural', 'concrete', 'optimization', 'energy', 'solar',
+    'battery', 'wireless', 'vision', 'language', 'graph', 'quantum',
+]
+
+
+def sentence(rng, words):
+    return ' '.join(rng.choice(TOPICS) for _ in range(words))
+
+
+def get_departments():
+    '''
+    Returns the seeded departments, creating them from
+    Department.DepartmentChoices if the fixtures were not loaded
+    '''
+    departments = list(Department.objects.all())
+    if not departments:
+        departments = Department.objects.bulk_create([
+            Department(full_name=label, short_name=value)
+            for value, label in Department.DepartmentChoices.choices
+        ])
+    return departments
+
+
+def get_privileges():
+    '''
+    Returns the privileges by code, creating them from
+    ProjectMemberPrivilege.AvailablePrivileges if the fixtures were not loaded
+    '''
+    privileges = {privilege.code: privilege for privilege in ProjectMemberPrivilege.objects.all()}
+    for code, label in ProjectMemberPrivilege.AvailablePrivileges.choices:
+        if code not in privileges:
+            privileges[code] = ProjectMemberPrivilege.objects.create(code=code, name=label)
+    return privileges
+
+
+def seed_labs(labs, departments, rng):
+    for start in range(0, labs, BATCH_SIZE):
+        Labs.objects.bulk_create([
+            Labs(
+                name='{} lab {}'.format(sentence(rng, 2), i),
+                department=rng.choice(departments),
+                description=sentence(rng, 30),
+            )
+            for i in range(start, min(start + BATCH_SIZE, labs))
+        ])
+
+
+def seed_members(projects, users, members, privileges, rng):
+    '''
+    Makes the head of every project its admin, and `members` other
+    users members with one of the other privileges
+    '''
+    admin = privileges[ProjectMemberPrivilege.AvailablePrivileges.ADMIN]
+    others = [privilege for code, privilege in privileges.items() if code != admin.code]
+    relationships = []
+    for project in projects:
+        relationships.append(ProjectMemberRelationship(project=project, user=project.head, privilege=admin))
+        # One more than needed, in case the head is drawn
+        drawn = rng.sample(users, min(members + 1, len(users)))
+        for user in [user for user in drawn if user.id != project.head_id][:members]:
+            relationships.append(ProjectMemberRelationship(
+                project=project, user=user, privilege=rng.choice(others),
+            ))
+    ProjectMemberRelationship.objects.bulk_create(relationships, batch_size=BATCH_SIZE)
+
+
+def seed_projects(projects, users=None, aors=None, seed=0, labs=0, members=None):
+    '''
+    Seeds `projects` projects along with the users and areas of research
+    they refer to, `labs` labs and, unless `members` is None, project
+    memberships (the head and `members` other users per project).
+    Returns the seeded projects' heads and areas of research.
+    '''
+    rng = random.Random(seed)
+    tag = get_random_string(6).lower()
+    users = users or max(1, projects // 20)
+    aors = aors or max(1, min(projects // 100, 2000))
+    departments = get_departments()
+
+    aor_objs = AreaOfResearch.objects.bulk_create([
+        AreaOfResearch(
+            name='{} {} {}'.format(sentence(rng, 2), tag, i),
+            slug=slugify('{} {}'.format(tag, i)),
+            department=rng.choice(departments),
+        )
+        for i in range(aors)
+    ])
+
+    password = make_password(None)
+    user_objs = []
+    for start in range(0, users, BATCH_SIZE):
+        user_objs += User.objects.bulk_create([
+            User(
+                email='{}-{}@nitt.edu'.format(tag, i),
+                name='{} {}'.format(rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)),
+                password=password,
+                is_staff=True,
+                is_verified=True,
+            )
+            for i in range(start, min(start + BATCH_SIZE, users))
+        ])
+
+    seed_labs(labs, departments, rng)
+    privileges = get_privileges() if members is not None else None
+
+    for start in range(0, projects, BATCH_SIZE):
+        batch = Project.objects.bulk_create([
+            Project(
+                name='{} {} {}'.format(sentence(rng, 3), tag, i),
+                abstract=sentence(rng, 60),
+                paper_link='https://scholar.google.com/{}/{}'.format(tag, i),
+                aor=rng.choice(aor_objs),
+                department=rng.choice(departments),
+                head=rng.choice(user_objs),
+            )
+            for i in range(start, min(start + BATCH_SIZE, projects))
+        ])
+        if privileges is not None:
+            seed_members(batch, user_objs, members, privileges, rng)
+
+    return user_objs, aor_objs
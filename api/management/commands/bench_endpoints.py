@@ -0,0 +1,268 @@
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from api import urls as api_urls
+from api.controllers.privilege_utilities import invalidate_all_privileges
+from api.controllers.reference_utilities import reference_cache
+from api.controllers.search_utilities import facet_cache, search_cache, suggest_cache
+from api.management.commands._bench import percentile, Rollback
+from api.management.commands._seed import seed_projects
+from api.models import Project, ProjectMemberPrivilege
+
+# Mix of researcher names, topics and misspelt queries
+QUERIES = ['Krishnan', 'machine learning', 'solar battery', 'Priya Iyer', 'robtics', 'catalisys']
+# What the search box sends while typing
+PREFIXES = [query[:length] for query in QUERIES for length in range(2, len(query) + 1)]
+PASSWORD = 'benchmark-password'
+
+
+class Context:
+    '''
+    Seeded rows and logged in clients the requests are built from
+    '''
+
+    def __init__(self, size, users, aors):
+        self.size = size
+        # Logged in as a staff user, the admin of `project`
+        self.staff = users[0]
+        self.project = Project.objects.filter(head=self.staff).select_related('aor', 'department').first()
+        self.aor = aors[0]
+        self.members = users[1:101]
+        self.client = Client(raise_request_exception=False)
+        self.client.force_login(self.staff)
+        # Logs in and out on its own, so that the staff session is kept
+        self.guest = users[-1]
+        self.guest.set_password(PASSWORD)
+        self.guest.save()
+        self.guest_client = Client(raise_request_exception=False)
+
+
+# Request of every route in api/urls.py, by url name. Each builder returns
+# (client, method, path, data) for the i-th request of the route and
+# runs any setup the request needs, which is not timed.
+def get(name, params=None):
+    return lambda ctx, i: (ctx.client, 'get', reverse('api:' + name), params or {})
+
+def login(ctx, i):
+    return ctx.guest_client, 'post', reverse('api:user-login'), {'email': ctx.guest.email, 'password': PASSWORD}
+
+def logout(ctx, i):
+    ctx.guest_client.force_login(ctx.guest)
+    session = ctx.guest_client.session
+    session['user_id'] = ctx.guest.id
+    session.save()
+    return ctx.guest_client, 'post', reverse('api:user-logout'), {}
+
+def register(ctx, i):
+    return Client(raise_request_exception=False), 'post', reverse('api:user-register'), {
+        'email': 'bench-{}-{}@nitt.edu'.format(ctx.size, i),
+        'password': PASSWORD,
+        'name': 'Bench User',
+    }
+
+def pass_reset(ctx, i):
+    return ctx.guest_client, 'post', reverse('api:user-pass-reset'), {'email': ctx.guest.email}
+
+def post(name, data):
+    return lambda ctx, i: (ctx.client, 'post', reverse('api:' + name), data(ctx, i))
+
+def project_form(ctx, i):
+    return {
+        'projectId': ctx.project.id,
+        'paperLink': 'https://scholar.google.com/bench/{}/{}'.format(ctx.size, i),
+        'abstract': ctx.project.abstract,
+        'areaOfResearch': ctx.project.aor.name,
+    }
+
+def create_form(ctx, i):
+    return {
+        'name': 'bench project {} {}'.format(ctx.size, i),
+        'abstract': ctx.project.abstract,
+        'paperLink': 'https://scholar.google.com/bench-create/{}/{}'.format(ctx.size, i),
+        'email': ctx.staff.email,
+        'department': ctx.project.department.short_name,
+        'areaOfResearch': ctx.aor.name,
+    }
+
+def members_form(ctx, i):
+    return {
+        'projectId': ctx.project.id,
+        'members': json.dumps([
+            {'email': user.email, 'privilege': ProjectMemberPrivilege.AvailablePrivileges.VIEW}
+            for user in ctx.members[i % 10 * 10:i % 10 * 10 + 10]
+        ]),
+    }
+
+ROUTES = {
+    'user-login': login,
+    'user-logout': logout,
+    'user-register': register,
+    'user-pass-reset': pass_reset,
+    'user-pass-update': post('user-pass-update', lambda ctx, i: {}),
+    'admin-users': post('admin-users', lambda ctx, i: {}),
+    'project-profile': post('project-profile', lambda ctx, i: {'projectId': ctx.project.id}),
+    'update-roles': post('update-roles', lambda ctx, i: {'projectId': ctx.project.id}),
+    'create-tags': post('create-tags', lambda ctx, i: {'projectId': ctx.project.id}),
+    'add-members': post('add-members', members_form),
+    'request-stats': get('request-stats'),
+    'projects-all': get('projects-all'),
+    'search': lambda ctx, i: (ctx.client, 'get', reverse('api:search'), {'query': QUERIES[i % len(QUERIES)]}),
+    'suggest': lambda ctx, i: (ctx.client, 'get', reverse('api:suggest'), {'query': PREFIXES[i % len(PREFIXES)]}),
+    'project-export': get('project-export'),
+    'project-detail': lambda ctx, i: (ctx.client, 'get', reverse('api:project-detail'), {
+        'id': ctx.project.id, 'expand': 'head,aor,department,members.privilege',
+    }),
+    'project-create': post('project-create', create_form),
+    'project-edit': post('project-edit', project_form),
+    'project-write': post('project-write', project_form),
+    'tags': get('tags'),
+    'aor-all': get('aor-all'),
+    'departments-all': get('departments-all'),
+    'centers-all': get('centers-all'),
+}
+
+# Routes reading the whole table, run fewer times
+SLOW_ROUTES = {'project-export': 3}
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks every route in api/urls.py on seeded databases of increasing size '
+        'and writes the latencies, queries and peak memory per request as JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 100000, 1000000])
+        parser.add_argument('--requests', type=int, default=50, help='Timed requests per route')
+        parser.add_argument('--routes', nargs='+', help='Url names of the routes to run, defaults to all')
+        parser.add_argument('--members', type=int, default=5, help='Members seeded per project')
+        parser.add_argument('--output', default='bench-results.json')
+
+    def handle(self, *args, **options):
+        names = [pattern.name for pattern in api_urls.urlpatterns]
+        missing = [name for name in names if name not in ROUTES]
+        if missing:
+            raise CommandError('No benchmark request for the routes {}'.format(', '.join(missing)))
+        if options['routes']:
+            unknown = set(options['routes']) - set(names)
+            if unknown:
+                raise CommandError('Unknown routes {}'.format(', '.join(sorted(unknown))))
+            names = [name for name in names if name in options['routes']]
+
+        results = []
+        # Every request of the benchmark would be rate limited otherwise
+        with override_settings(RATE_LIMITS={}, EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'):
+            for size in options['sizes']:
+                try:
+                    with transaction.atomic():
+                        results += self.run(size, names, options)
+                        raise Rollback()
+                except Rollback:
+                    pass
+
+        report = {
+            'commit': get_commit(),
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'requests': options['requests'],
+            'results': results,
+        }
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS('Wrote {}'.format(options['output'])))
+
+    def run(self, size, names, options):
+        self.stdout.write('Seeding {} projects'.format(size))
+        users, aors = seed_projects(
+            size, labs=max(1, size // 1000), members=options['members'],
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        # Entries cached by an earlier size refer to rolled back rows
+        invalidate_all_privileges()
+        reference_cache.clear()
+        search_cache.clear()
+        facet_cache.clear()
+        suggest_cache.clear()
+        ctx = Context(size, users, aors)
+
+        self.stdout.write('{:>8} {:>18} {:>8} {:>10} {:>10} {:>10} {:>8} {:>12}'.format(
+            'projects', 'route', 'status', 'p50 (ms)', 'p90 (ms)', 'p99 (ms)', 'queries', 'peak (KiB)'))
+        results = []
+        for name in names:
+            result = self.measure(ctx, name, min(options['requests'], SLOW_ROUTES.get(name, options['requests'])))
+            self.stdout.write('{:>8} {:>18} {:>8} {:>10.2f} {:>10.2f} {:>10.2f} {:>8} {:>12.0f}'.format(
+                size, name, ','.join(str(status) for status in result['status_codes']),
+                result['p50_ms'], result['p90_ms'], result['p99_ms'],
+                result['max_queries'], result['peak_memory_kib']))
+            results.append(result)
+        return results
+
+    def request(self, ctx, name, i):
+        '''
+        Sends the i-th request of the route, returns its status code
+        '''
+        client, method, path, data = ROUTES[name](ctx, i)
+        response = getattr(client, method)(path, data)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response.status_code
+
+    def measure(self, ctx, name, requests):
+        # Warms up the caches and the connection
+        self.request(ctx, name, 0)
+
+        timings = []
+        queries = []
+        status_codes = set()
+        for i in range(1, requests + 1):
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                status_codes.add(self.request(ctx, name, i))
+                timings.append((time.perf_counter() - start) * 1000)
+            queries.append(len(captured))
+
+        # Measured apart, since tracing allocations slows down the requests
+        tracemalloc.start()
+        try:
+            self.request(ctx, name, requests + 1)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        timings.sort()
+        return {
+            'projects': ctx.size,
+            'route': name,
+            'requests': requests,
+            'status_codes': sorted(status_codes),
+            'mean_ms': sum(timings) / len(timings),
+            'p50_ms': percentile(timings, 0.5),
+            'p90_ms': percentile(timings, 0.9),
+            'p99_ms': percentile(timings, 0.99),
+            'max_ms': timings[-1],
+            'mean_queries': sum(queries) / len(queries),
+            'max_queries': max(queries),
+            'peak_memory_kib': peak / 1024,
+        }
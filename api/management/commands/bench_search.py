@@ -0,0 +1,69 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from api.controllers.search_utilities import search_projects
+from api.management.commands._bench import percentile, Rollback
+from api.management.commands._seed import seed_projects
+from api.models import Project
+
+# Mix of researcher names, topics and misspelt queries
+QUERIES = ['Krishnan', 'machine learning', 'solar battery', 'Priya Iyer', 'robtics', 'catalisys']
+
+
+def legacy_search(query):
+    '''
+    The search which ran before the full text search
+    '''
+    return list(Project.objects.filter(
+        Q(head__name__unaccent__icontains=query)
+        | Q(name__unaccent__icontains=query)
+        | Q(aor__name__unaccent__icontains=query)
+    ))
+
+
+class Command(BaseCommand):
+    help = 'Compares the full text project search against the old icontains search'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--projects', type=int, default=1000000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument(
+            '--skip-legacy', action='store_true',
+            help='Do not time the old search, which scans every project',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.stdout.write('Seeding {} projects'.format(options['projects']))
+                seed_projects(options['projects'])
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE api_project, api_user, api_areaofresearch')
+                self.run(options)
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def run(self, options):
+        self.stdout.write('{:>20} {:>14} {:>14}'.format('query', 'search (ms)', 'legacy (ms)'))
+        for query in QUERIES:
+            search = self.time(lambda: search_projects(query), options['repeat'])
+            if options['skip_legacy']:
+                legacy = float('nan')
+            else:
+                legacy = self.time(lambda: legacy_search(query), options['repeat'])
+            self.stdout.write('{:>20} {:>14.2f} {:>14.2f}'.format(query, search, legacy))
+
+    def time(self, func, repeat):
+        '''
+        Returns the median run time in milliseconds
+        '''
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return percentile(sorted(timings), 0.5)
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.forms.models import model_to_dict
+
+from api.controllers.serializer_utilities import get_serializer
+from api.management.commands._bench import percentile, Rollback
+from api.management.commands._seed import seed_projects
+from api.models import Project
+
+
+class Command(BaseCommand):
+    help = 'Compares the row serializers against model_to_dict on seeded projects'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[10000, 100000])
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.stdout.write('Seeding {} projects'.format(max(options['sizes'])))
+                seed_projects(max(options['sizes']))
+                self.run(options)
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def run(self, options):
+        serializer = get_serializer(Project)
+        expanded = get_serializer(Project, ('aor', 'department', 'head'))
+        projects = Project.objects.order_by('-created_at', '-id')
+        paths = [
+            ('model_to_dict', lambda size: [model_to_dict(project) for project in projects[:size]]),
+            ('serializer', lambda size: [serializer.build(row) for row in serializer.rows(projects)[:size]]),
+            ('serializer +expand', lambda size: [expanded.build(row) for row in expanded.rows(projects)[:size]]),
+        ]
+        self.stdout.write('{:>8} {:>20} {:>12}'.format('rows', 'path', 'median (ms)'))
+        for size in options['sizes']:
+            for name, serialize in paths:
+                timings = []
+                for _ in range(options['repeat']):
+                    start = time.perf_counter()
+                    serialize(size)
+                    timings.append((time.perf_counter() - start) * 1000)
+                median = percentile(sorted(timings), 0.5)
+                self.stdout.write('{:>8} {:>20} {:>12.1f}'.format(size, name, median))
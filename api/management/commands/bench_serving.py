@@ -0,0 +1,72 @@
+import http.client
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand
+
+from api.management.commands._bench import percentile
+
+DEFAULT_PATHS = [
+    '/api/projects',
+    '/api/project/search?query=machine+learning',
+    '/api/aor',
+    '/api/department',
+    '/api/center',
+]
+
+
+class Command(BaseCommand):
+    help = 'Load tests the read endpoints of running servers, eg. uwsgi against gunicorn + uvicorn'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'servers', nargs='+',
+            help='Base urls of the servers, eg. http://localhost:8000 http://localhost:8001',
+        )
+        parser.add_argument('--paths', nargs='+', default=DEFAULT_PATHS)
+        parser.add_argument('--concurrency', type=int, default=64)
+        parser.add_argument('--requests', type=int, default=5000, help='Requests per server and path')
+
+    def handle(self, *args, **options):
+        self.stdout.write('{:>24} {:>44} {:>10} {:>10} {:>10} {:>8}'.format(
+            'server', 'path', 'req/s', 'p50 (ms)', 'p99 (ms)', 'errors'))
+        for server in options['servers']:
+            for path in options['paths']:
+                throughput, timings, errors = self.load(server, path, options['concurrency'], options['requests'])
+                self.stdout.write('{:>24} {:>44} {:>10.1f} {:>10.1f} {:>10.1f} {:>8}'.format(
+                    server, path[:44], throughput,
+                    percentile(timings, 0.5), percentile(timings, 0.99), errors))
+
+    def load(self, server, path, concurrency, requests):
+        '''
+        Sends `requests` GETs from `concurrency` keep-alive connections.
+        Returns the throughput, sorted latencies and number of errors.
+        '''
+        url = urlsplit(server)
+        local = threading.local()
+
+        def get(_):
+            if not hasattr(local, 'connection'):
+                local.connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=60)
+            start = time.perf_counter()
+            try:
+                local.connection.request('GET', path)
+                response = local.connection.getresponse()
+                response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException):
+                local.connection.close()
+                del local.connection
+                ok = False
+            return (time.perf_counter() - start) * 1000, ok
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(get, range(requests)))
+        elapsed = time.perf_counter() - start
+
+        timings = sorted(timing for timing, _ in results)
+        errors = sum(1 for _, ok in results if not ok)
+        return requests / elapsed, timings, errors
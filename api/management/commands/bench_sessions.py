@@ -0,0 +1,70 @@
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from api.controllers.user_utilities import remove_existing_sessions
+from api.management.commands._bench import Rollback
+from api.models import User, UserSession
+
+BATCH_SIZE = 10000
+
+
+class Command(BaseCommand):
+    help = 'Measures the cost of removing a user\'s sessions on login as the session table grows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', nargs='+', type=int,
+            default=[1000, 10000, 100000, 1000000],
+            help='Number of sessions to seed for each round',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Logins timed per round',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('{:>10} {:>12} {:>12}'.format('sessions', 'mean (ms)', 'max (ms)'))
+        for size in options['sizes']:
+            try:
+                with transaction.atomic():
+                    timings = self.run_round(size, options['repeat'])
+                    raise Rollback()
+            except Rollback:
+                pass
+            self.stdout.write('{:>10} {:>12.3f} {:>12.3f}'.format(
+                size, sum(timings) / len(timings), max(timings)))
+
+    def run_round(self, size, repeat):
+        password = make_password(None)
+        users = User.objects.bulk_create([
+            User(email='bench-{}@nitt.edu'.format(i), name='bench', password=password)
+            for i in range(repeat + 1)
+        ])
+        # Every timed user owns a single session, everything else
+        # belongs to the last user
+        owners = [user.id for user in users]
+        expire_date = timezone.now() + timedelta(days=1)
+
+        for start in range(0, size, BATCH_SIZE):
+            UserSession.objects.bulk_create([
+                UserSession(
+                    session_key=get_random_string(32),
+                    session_data='',
+                    expire_date=expire_date,
+                    user_id=owners[i] if i < repeat else owners[-1],
+                )
+                for i in range(start, min(start + BATCH_SIZE, size))
+            ])
+
+        timings = []
+        for user_id in owners[:repeat]:
+            start = time.perf_counter()
+            remove_existing_sessions(user_id)
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
@@ -0,0 +1,165 @@
+import csv
+import json
+import os
+import sys
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import URLValidator
+from django.db import transaction
+
+from api.controllers.search_utilities import bump_generation
+from api.models import (
+    AreaOfResearch, Department, Project, ProjectMemberPrivilege,
+    ProjectMemberRelationship, User,
+)
+
+# Same keys as the project/create form
+FIELDS = ('name', 'abstract', 'paperLink', 'department', 'areaOfResearch', 'email')
+
+
+class Command(BaseCommand):
+    help = (
+        'Imports projects from a CSV (with a header row) or JSONL file, '
+        'with the same fields as project/create: ' + ', '.join(FIELDS)
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import, - for stdin')
+        parser.add_argument('--format', choices=('csv', 'jsonl'), help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Projects inserted per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Validate the rows without importing them')
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or os.path.splitext(options['path'])[1].lstrip('.').lower()
+        if fmt not in ('csv', 'jsonl'):
+            raise CommandError('Cannot tell the format of {}, use --format'.format(options['path']))
+
+        self.preload()
+        stream = sys.stdin if options['path'] == '-' else open(options['path'], newline='', encoding='utf-8')
+        start = time.perf_counter()
+        imported = skipped = 0
+        try:
+            batch = []
+            for line, row in self.read(stream, fmt):
+                project = self.validate(line, row)
+                if project is None:
+                    skipped += 1
+                    continue
+                batch.append(project)
+                if len(batch) >= options['batch_size']:
+                    imported += self.load(batch, options['dry_run'])
+                    batch = []
+            imported += self.load(batch, options['dry_run'])
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        self.stdout.write(self.style.SUCCESS('{} {} projects, skipped {} in {:.1f}s'.format(
+            'Validated' if options['dry_run'] else 'Imported',
+            imported, skipped, time.perf_counter() - start)))
+
+    def preload(self):
+        '''
+        Loads everything rows are resolved and checked against,
+        so that validating a row runs no query
+        '''
+        self.departments = dict(Department.objects.values_list('short_name', 'id'))
+        self.aors = dict(AreaOfResearch.objects.values_list('name', 'id'))
+        self.users = dict(User.objects.values_list('email', 'id'))
+        self.names = set(Project.objects.values_list('name', flat=True))
+        self.paper_links = set(Project.objects.values_list('paper_link', flat=True))
+        try:
+            self.admin = ProjectMemberPrivilege.objects.get(code=ProjectMemberPrivilege.AvailablePrivileges.ADMIN)
+        except ProjectMemberPrivilege.DoesNotExist:
+            raise CommandError('Admin privilege not found, load the fixtures first')
+        self.validate_url = URLValidator()
+        # URLField's default of 200, longer links would fail the whole batch's insert
+        self.paper_link_length = Project._meta.get_field('paper_link').max_length
+
+    def read(self, stream, fmt):
+        '''
+        Yields (line number, row) pairs
+        '''
+        if fmt == 'csv':
+            reader = csv.DictReader(stream)
+            for row in reader:
+                yield reader.line_num, row
+            return
+        for line, text in enumerate(stream, start=1):
+            if text.strip():
+                try:
+                    yield line, json.loads(text)
+                except ValueError:
+                    yield line, None
+
+    def validate(self, line, row):
+        '''
+        Returns the Project of a row, None (after reporting why) if it is invalid
+        '''
+        if not isinstance(row, dict):
+            return self.skip(line, 'Invalid row')
+        for field in FIELDS:
+            # JSONL rows can hold numbers, lists or objects
+            if not isinstance(row.get(field) or '', str):
+                return self.skip(line, 'Invalid {}'.format(field))
+        row = {field: (row.get(field) or '').strip() for field in FIELDS}
+
+        if not row['name'] or len(row['name']) > 255:
+            return self.skip(line, 'Invalid name')
+        if row['name'] in self.names:
+            return self.skip(line, 'A project with the same name exists')
+        if len(row['abstract']) > 10000:
+            return self.skip(line, 'Abstract is too long')
+        try:
+            self.validate_url(row['paperLink'])
+        except ValidationError:
+            return self.skip(line, 'Invalid google scholar\'s link')
+        if len(row['paperLink']) > self.paper_link_length:
+            return self.skip(line, 'Google scholar\'s link is too long')
+        if row['paperLink'] in self.paper_links:
+            return self.skip(line, 'Google scholar\'s link already exists')
+
+        department_id = self.departments.get(row['department'])
+        if department_id is None:
+            return self.skip(line, 'Department doesn\'t exist')
+        aor_id = self.aors.get(row['areaOfResearch'])
+        if aor_id is None:
+            return self.skip(line, 'Area of research doesn\'t exist')
+        head_id = self.users.get(row['email'])
+        if head_id is None:
+            return self.skip(line, 'User does not exist')
+
+        # Later rows must not repeat this one
+        self.names.add(row['name'])
+        self.paper_links.add(row['paperLink'])
+        return Project(
+            name=row['name'],
+            abstract=row['abstract'],
+            paper_link=row['paperLink'],
+            department_id=department_id,
+            aor_id=aor_id,
+            head_id=head_id,
+        )
+
+    def skip(self, line, reason):
+        self.stderr.write('Row {}: {}'.format(line, reason))
+        return None
+
+    def load(self, projects, dry_run):
+        '''
+        Inserts the projects and their heads' admin memberships in one transaction
+        '''
+        if not projects or dry_run:
+            return len(projects)
+        with transaction.atomic():
+            Project.objects.bulk_create(projects)
+            ProjectMemberRelationship.objects.bulk_create([
+                ProjectMemberRelationship(project_id=project.id, user_id=project.head_id, privilege=self.admin)
+                for project in projects
+            ])
+        # Bulk inserts send no post_save signal
+        bump_generation()
+        self.stdout.write('Imported {} projects'.format(len(projects)))
+        return len(projects)
@@ -0,0 +1,38 @@
+from collections import namedtuple
+from django.utils.functional import SimpleLazyObject
+from api.middleware.base import HybridMiddleware
+
+# Read-only view of who is making the request. Built at most once per
+# request from the session and user already loaded by django's
+# SessionMiddleware and AuthenticationMiddleware.
+AuthContext = namedtuple('AuthContext', ['user', 'user_id', 'is_authenticated', 'is_staff'])
+
+ANONYMOUS = AuthContext(user=None, user_id=None, is_authenticated=False, is_staff=False)
+
+
+def get_auth_context(request):
+    '''
+    Validates that the user id set on login matches the user
+    authenticated by django and returns the auth context
+    '''
+    user_id = request.session.get('user_id')
+    user = request.user
+    if user_id is None or not user.is_authenticated or user.pk != user_id:
+        return ANONYMOUS
+    return AuthContext(user=user, user_id=user_id, is_authenticated=True, is_staff=user.is_staff)
+
+
+class AuthContextMiddleware(HybridMiddleware):
+    '''
+    Attaches `request.auth_context`. It is evaluated lazily, so requests
+    which never check permissions do not load the session or the user.
+    Must come after AuthenticationMiddleware.
+    '''
+
+    def handle(self, request):
+        request.auth_context = SimpleLazyObject(lambda: get_auth_context(request))
+        return self.get_response(request)
+
+    async def ahandle(self, request):
+        request.auth_context = SimpleLazyObject(lambda: get_auth_context(request))
+        return await self.get_response(request)
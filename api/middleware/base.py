@@ -0,0 +1,32 @@
+import asyncio
+
+
+class HybridMiddleware:
+    '''
+    Base of the middlewares, which run in the event loop under ASGI and
+    in the request's thread under WSGI. Under ASGI django runs sync only
+    middlewares in a single thread shared by every request, which would
+    serialize the requests. Subclasses implement `handle` for WSGI and
+    `ahandle` for ASGI, by default both pass the request on.
+    '''
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Marks the instance as a coroutine function, as django's
+            # MiddlewareMixin does, so that django awaits it
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.ahandle(request)
+        return self.handle(request)
+
+    def handle(self, request):
+        return self.get_response(request)
+
+    async def ahandle(self, request):
+        return await self.get_response(request)
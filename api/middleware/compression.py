@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from api.controllers.compression_utilities import choose_encoding, compress, compress_stream, ENCODINGS
+from api.middleware.base import HybridMiddleware
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/', 'application/javascript')
+
+
+class CompressionMiddleware(HybridMiddleware):
+    '''
+    Compresses responses with brotli or gzip, whichever the client accepts
+    (brotli first). Responses smaller than COMPRESSION_MIN_SIZE and already
+    compressed content types are sent as they are. Responses built from a
+    cache carry their content compressed in advance (`precompressed`,
+    by encoding), which is sent without compressing it again.
+    '''
+
+    def handle(self, request):
+        return self.compress_response(request, self.get_response(request))
+
+    async def ahandle(self, request):
+        return self.compress_response(request, await self.get_response(request))
+
+    def compress_response(self, request, response):
+        if (
+            response.status_code != 200
+            or response.has_header('Content-Encoding')
+            or not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES)
+        ):
+            return response
+
+        precompressed = getattr(response, 'precompressed', None)
+        if precompressed is not None:
+            encodings = tuple(precompressed)
+        elif response.streaming or len(response.content) >= settings.COMPRESSION_MIN_SIZE:
+            encodings = ENCODINGS
+        else:
+            encodings = ()
+        if not encodings:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), encodings)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_stream(response.streaming_content, encoding)
+            if response.has_header('Content-Length'):
+                del response['Content-Length']
+        else:
+            content = precompressed[encoding] if precompressed else compress(response.content, encoding)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response['Content-Length'] = str(len(content))
+
+        # The compressed bytes differ from the ones the ETag was computed on
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
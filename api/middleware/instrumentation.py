@@ -0,0 +1,70 @@
+from api.controllers.metrics_utilities import current_metrics, record_request, RequestMetrics
+from api.middleware.base import HybridMiddleware
+import time
+
+
+class RequestMetricsMiddleware(HybridMiddleware):
+    '''
+    Measures the queries, database time, duplicate queries, serialization
+    time and total time of every request. Sends them in a Server-Timing
+    header and adds them to the stats of the request's route.
+    Should be the first middleware, so that the others are timed too.
+    Queries of streamed responses run after the header is sent, they are
+    added to the stats once the response is sent.
+    '''
+
+    def handle(self, request):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics, start)
+
+    async def ahandle(self, request):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics, start)
+
+    def finish(self, request, response, metrics, start):
+        total_time = time.perf_counter() - start
+        response['Server-Timing'] = ', '.join([
+            'db;dur={:.2f};desc="{} queries"'.format(metrics.db_time * 1000, metrics.queries),
+            'dup;desc="{} duplicate queries"'.format(metrics.duplicates),
+            'ser;dur={:.2f}'.format(metrics.serialization_time * 1000),
+            'total;dur={:.2f}'.format(total_time * 1000),
+        ])
+
+        match = getattr(request, 'resolver_match', None)
+        route = match.view_name if match is not None else 'unresolved'
+        if response.streaming:
+            response.streaming_content = self.measure_stream(response.streaming_content, route, metrics, start)
+        else:
+            record_request(route, metrics, total_time)
+        return response
+
+    def measure_stream(self, chunks, route, metrics, start):
+        '''
+        Yields the chunks of a streamed response, counting the queries
+        run to produce them in the request's metrics
+        '''
+        chunks = iter(chunks)
+        try:
+            while True:
+                token = current_metrics.set(metrics)
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    return
+                finally:
+                    current_metrics.reset(token)
+                yield chunk
+        finally:
+            record_request(route, metrics, time.perf_counter() - start)
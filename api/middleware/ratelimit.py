@@ -0,0 +1,130 @@
+from threading import Lock
+from django.conf import settings
+from django.http import JsonResponse
+from api.controllers.cache_utilities import LRUCache, MISSING
+from api.middleware.base import HybridMiddleware
+import logging
+import math
+import struct
+import time
+
+try:
+    # Only importable when running under uwsgi
+    import uwsgi
+except ImportError:
+    uwsgi = None
+
+logger = logging.getLogger(__name__)
+
+# Tokens left and time of the last update of a bucket
+BUCKET = struct.Struct('dd')
+
+
+class LocalBucketStore:
+    '''
+    Buckets of a single process, used when not running under uwsgi
+    '''
+
+    def __init__(self):
+        self.buckets = LRUCache(max_size=100000)
+        self.lock = Lock()
+
+    def __enter__(self):
+        self.lock.acquire()
+
+    def __exit__(self, *exc_info):
+        self.lock.release()
+
+    def get(self, key):
+        bucket = self.buckets.get(key)
+        return None if bucket is MISSING else bucket
+
+    def set(self, key, bucket, expires):
+        self.buckets.set(key, bucket)
+
+
+class UwsgiBucketStore:
+    '''
+    Buckets in a uwsgi cache, shared by every worker and thread.
+    Updates are serialized with uwsgi's lock.
+    '''
+
+    def __init__(self, cache_name):
+        self.cache_name = cache_name
+
+    def __enter__(self):
+        uwsgi.lock()
+
+    def __exit__(self, *exc_info):
+        uwsgi.unlock()
+
+    def get(self, key):
+        value = uwsgi.cache_get(key, self.cache_name)
+        return BUCKET.unpack(value) if value else None
+
+    def set(self, key, bucket, expires):
+        uwsgi.cache_update(key, BUCKET.pack(*bucket), expires, self.cache_name)
+
+
+def take_token(store, key, capacity, period):
+    '''
+    Takes a token from the bucket, which holds up to `capacity` tokens
+    and is refilled at `capacity` tokens per `period` seconds.
+    Returns the number of seconds to wait before a token is available,
+    0 if a token was taken.
+    '''
+    rate = capacity / period
+    now = time.time()
+    with store:
+        bucket = store.get(key)
+        tokens, updated_at = bucket if bucket is not None else (capacity, now)
+        tokens = min(capacity, tokens + (now - updated_at) * rate)
+        wait = 0 if tokens >= 1 else (1 - tokens) / rate
+        if not wait:
+            tokens -= 1
+        # The bucket is full again once it expires
+        store.set(key, (tokens, now), math.ceil((capacity - tokens) / rate))
+    return wait
+
+
+class RateLimitMiddleware(HybridMiddleware):
+    '''
+    Limits the requests to the routes in RATE_LIMITS with token buckets
+    keyed on the client's ip and on the email sent in the request.
+    Limited requests are rejected before the view runs any query.
+    '''
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if uwsgi is not None and settings.RATE_LIMIT_UWSGI_CACHE:
+            self.store = UwsgiBucketStore(settings.RATE_LIMIT_UWSGI_CACHE)
+        else:
+            self.store = LocalBucketStore()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        route = request.resolver_match.url_name
+        limits = settings.RATE_LIMITS.get(route)
+        if not limits:
+            return None
+
+        # The ip is checked first, since reading the email parses the body
+        keys = []
+        if 'ip' in limits:
+            keys.append(('ip', request.META.get(settings.RATE_LIMIT_IP_HEADER, '')))
+        if 'email' in limits:
+            keys.append(('email', (request.POST.get('email') or '').strip().lower()))
+
+        for kind, value in keys:
+            if not value:
+                continue
+            capacity, period = limits[kind]
+            wait = take_token(self.store, '{}:{}:{}'.format(route, kind, value), capacity, period)
+            if wait:
+                logger.info('{}({}={}) Rate limited'.format(route, kind, value))
+                response = JsonResponse({
+                    'status_code': 429,
+                    'data': 'Too many requests. Please try again later.',
+                }, status=429)
+                response['Retry-After'] = math.ceil(wait)
+                return response
+        return None
@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS
+from api.backends.replica_router import current_state, ReplicaState
+from api.middleware.base import HybridMiddleware
+import random
+import time
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaMiddleware(HybridMiddleware):
+    '''
+    Sends the reads of safe requests (GET, HEAD, OPTIONS) to one of the read
+    replicas. Once a request writes, a cookie pins the client's requests to
+    the primary for REPLICA_PIN_SECONDS, so that it reads its own writes
+    (including its session after logging in) while the replicas catch up.
+    Not used when no replica is configured.
+    '''
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.replicas = [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+        if not self.replicas:
+            raise MiddlewareNotUsed()
+
+    def handle(self, request):
+        state = self.get_state(request)
+        token = current_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_state.reset(token)
+        return self.pin(response, state)
+
+    async def ahandle(self, request):
+        state = self.get_state(request)
+        token = current_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_state.reset(token)
+        return self.pin(response, state)
+
+    def get_state(self, request):
+        state = ReplicaState()
+        if request.method in SAFE_METHODS and not self.is_pinned(request):
+            state.alias = random.choice(self.replicas)
+        return state
+
+    def pin(self, response, state):
+        '''
+        Pins the client to the primary if the request wrote
+        '''
+        if state.wrote:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE,
+                '{:.0f}'.format(time.time() + settings.REPLICA_PIN_SECONDS),
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def is_pinned(self, request):
+        try:
+            return float(request.COOKIES.get(settings.REPLICA_PIN_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
@@ -0,0 +1,70 @@
+# Generated by Django 3.2.4 on 2026-10-17 10:12
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.db import migrations, models
+from django.utils import timezone
+import django.db.models.deletion
+
+BATCH_SIZE = 1000
+
+
+def copy_sessions(apps, schema_editor):
+    """
+    Copies the live sessions from django's session table into UserSession,
+    decoding each session once to fill in the user column
+    """
+    from django.contrib.sessions.backends.db import SessionStore
+
+    Session = apps.get_model('sessions', 'Session')
+    UserSession = apps.get_model('api', 'UserSession')
+    User = apps.get_model('api', 'User')
+
+    store = SessionStore()
+    user_ids = set(User.objects.values_list('id', flat=True))
+    sessions = Session.objects.filter(expire_date__gt=timezone.now())
+
+    batch = []
+    for session in sessions.iterator(chunk_size=BATCH_SIZE):
+        data = store.decode(session.session_data)
+        user_id = data.get('user_id', data.get(SESSION_KEY))
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            user_id = None
+        batch.append(UserSession(
+            session_key=session.session_key,
+            session_data=session.session_data,
+            expire_date=session.expire_date,
+            user_id=user_id if user_id in user_ids else None,
+        ))
+        if len(batch) >= BATCH_SIZE:
+            UserSession.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    UserSession.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sessions', '0001_initial'),
+        ('api', '0008_auto_20210820_1925'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSession',
+            fields=[
+                ('session_key', models.CharField(max_length=40, primary_key=True, serialize=False, verbose_name='session key')),
+                ('session_data', models.TextField(verbose_name='session data')),
+                ('expire_date', models.DateTimeField(db_index=True, verbose_name='expire date')),
+                ('user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'session',
+                'verbose_name_plural': 'sessions',
+                'abstract': False,
+            },
+        ),
+        migrations.RunPython(copy_sessions, migrations.RunPython.noop),
+    ]
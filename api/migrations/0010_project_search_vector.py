@@ -0,0 +1,104 @@
+# Generated by Django 3.2.4 on 2026-10-17 11:40
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# Text search configuration, must match SEARCH_CONFIG in settings
+SEARCH_CONFIG = 'english'
+
+CREATE_SEARCH_VECTOR_FUNCTIONS = """
+CREATE FUNCTION api_project_search_vector(
+    p_name text, p_abstract text, p_aor_id bigint, p_head_id bigint
+) RETURNS tsvector AS $$
+    SELECT
+        setweight(to_tsvector('{config}', unaccent(coalesce(p_name, ''))), 'A') ||
+        setweight(to_tsvector('{config}', unaccent(coalesce(
+            (SELECT name FROM api_user WHERE id = p_head_id), ''))), 'B') ||
+        setweight(to_tsvector('{config}', unaccent(coalesce(
+            (SELECT name FROM api_areaofresearch WHERE id = p_aor_id), ''))), 'B') ||
+        setweight(to_tsvector('{config}', unaccent(coalesce(p_abstract, ''))), 'C');
+$$ LANGUAGE SQL STABLE;
+
+CREATE FUNCTION api_project_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := api_project_search_vector(NEW.name, NEW.abstract, NEW.aor_id, NEW.head_id);
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION api_project_search_vector_refresh() RETURNS trigger AS $$
+BEGIN
+    IF NEW.name IS DISTINCT FROM OLD.name THEN
+        IF TG_TABLE_NAME = 'api_user' THEN
+            UPDATE api_project
+            SET search_vector = api_project_search_vector(name, abstract, aor_id, head_id)
+            WHERE head_id = NEW.id;
+        ELSE
+            UPDATE api_project
+            SET search_vector = api_project_search_vector(name, abstract, aor_id, head_id)
+            WHERE aor_id = NEW.id;
+        END IF;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER api_project_search_vector_update
+    BEFORE INSERT OR UPDATE OF name, abstract, aor_id, head_id ON api_project
+    FOR EACH ROW EXECUTE PROCEDURE api_project_search_vector_update();
+
+CREATE TRIGGER api_user_search_vector_refresh
+    AFTER UPDATE OF name ON api_user
+    FOR EACH ROW EXECUTE PROCEDURE api_project_search_vector_refresh();
+
+CREATE TRIGGER api_areaofresearch_search_vector_refresh
+    AFTER UPDATE OF name ON api_areaofresearch
+    FOR EACH ROW EXECUTE PROCEDURE api_project_search_vector_refresh();
+
+UPDATE api_project
+SET search_vector = api_project_search_vector(name, abstract, aor_id, head_id);
+""".format(config=SEARCH_CONFIG)
+
+DROP_SEARCH_VECTOR_FUNCTIONS = """
+DROP TRIGGER api_areaofresearch_search_vector_refresh ON api_areaofresearch;
+DROP TRIGGER api_user_search_vector_refresh ON api_user;
+DROP TRIGGER api_project_search_vector_update ON api_project;
+DROP FUNCTION api_project_search_vector_refresh();
+DROP FUNCTION api_project_search_vector_update();
+DROP FUNCTION api_project_search_vector(text, text, bigint, bigint);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_usersession'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='project',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunSQL(CREATE_SEARCH_VECTOR_FUNCTIONS, DROP_SEARCH_VECTOR_FUNCTIONS),
+        migrations.AddIndex(
+            model_name='project',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='project_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='project_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='areaofresearch',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='aor_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='user_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.2.4 on 2026-10-17 16:20
+
+from django.db import migrations, models
+
+# Keeps the first membership of a user in a project
+REMOVE_DUPLICATE_MEMBERS = """
+DELETE FROM api_projectmemberrelationship a
+USING api_projectmemberrelationship b
+WHERE a.user_id = b.user_id AND a.project_id = b.project_id AND a.id > b.id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_project_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunSQL(REMOVE_DUPLICATE_MEMBERS, migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name='projectmemberrelationship',
+            constraint=models.UniqueConstraint(fields=('user', 'project'), name='unique_project_member'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 3.2.4 on 2026-10-17 17:02
+
+from django.db import IntegrityError, migrations, models
+from django.db.models import Count
+
+
+def check_duplicates(apps, schema_editor):
+    """
+    Fails with the ids of the projects sharing a name or a paper link, if
+    any. Projects were checked for duplicates before being saved, which
+    concurrent requests could both pass. Which of them to keep, rename or
+    merge is not for the migration to decide.
+    """
+    Project = apps.get_model('api', 'Project')
+    duplicates = []
+    for field in ('name', 'paper_link'):
+        values = Project.objects.values(field).annotate(count=Count('id')).filter(count__gt=1)
+        for value in values.values_list(field, flat=True).order_by(field):
+            ids = list(Project.objects.filter(**{field: value}).order_by('id').values_list('id', flat=True))
+            duplicates.append('{} {!r}: projects {}'.format(field, value, ', '.join(map(str, ids))))
+    if duplicates:
+        raise IntegrityError(
+            'Projects must have unique names and paper links, '
+            'rename or delete the duplicates and migrate again:\n' + '\n'.join(duplicates)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_unique_project_member'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='project',
+            constraint=models.UniqueConstraint(fields=('name',), name='unique_project_name'),
+        ),
+        migrations.AddConstraint(
+            model_name='project',
+            constraint=models.UniqueConstraint(fields=('paper_link',), name='unique_project_paper_link'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 3.2.4 on 2026-10-17 20:41
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_unique_project_name_paper_link'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=django.contrib.postgres.indexes.GistIndex(fields=['name'], name='project_name_trgm_gist_idx', opclasses=['gist_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='areaofresearch',
+            index=django.contrib.postgres.indexes.GistIndex(fields=['name'], name='aor_name_trgm_gist_idx', opclasses=['gist_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GistIndex(fields=['name'], name='user_name_trgm_gist_idx', opclasses=['gist_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.4 on 2026-10-17 22:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_name_trgm_gist_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='projectmemberrelationship',
+            name='project',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='members', to='api.project'),
+        ),
+    ]
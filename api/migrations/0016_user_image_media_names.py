@@ -0,0 +1,51 @@
+# Generated by Django 3.2.4 on 2026-10-18 00:30
+
+from django.conf import settings
+from django.db import migrations
+from urllib.parse import quote, unquote
+
+BATCH_SIZE = 1000
+
+
+def urls_to_names(apps, schema_editor):
+    """
+    Profile pictures used to be stored as their url (MEDIA_URL followed by
+    the quoted file name), the image field now holds the name relative to
+    MEDIA_ROOT
+    """
+    User = apps.get_model('api', 'User')
+    users = User.objects.filter(image__startswith=settings.MEDIA_URL).only('id', 'image')
+    batch = []
+    for user in users.iterator(chunk_size=BATCH_SIZE):
+        user.image = unquote(user.image.name[len(settings.MEDIA_URL):])
+        batch.append(user)
+        if len(batch) >= BATCH_SIZE:
+            User.objects.bulk_update(batch, ['image'])
+            batch = []
+    User.objects.bulk_update(batch, ['image'])
+
+
+def names_to_urls(apps, schema_editor):
+    User = apps.get_model('api', 'User')
+    users = User.objects.exclude(image='').exclude(image__isnull=True).exclude(
+        image__startswith=settings.MEDIA_URL,
+    ).only('id', 'image')
+    batch = []
+    for user in users.iterator(chunk_size=BATCH_SIZE):
+        user.image = settings.MEDIA_URL + quote(user.image.name)
+        batch.append(user)
+        if len(batch) >= BATCH_SIZE:
+            User.objects.bulk_update(batch, ['image'])
+            batch = []
+    User.objects.bulk_update(batch, ['image'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_projectmemberrelationship_members'),
+    ]
+
+    operations = [
+        migrations.RunPython(urls_to_names, names_to_urls),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 3.2.4 on 2026-10-18 00:27
+
+import api.models
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+# unaccent() is only stable, since its dictionary could change, so indexes
+# cannot be built on it. The dictionary is named to make the wrapper immutable.
+CREATE_UNACCENT_FUNCTION = """
+CREATE FUNCTION api_unaccent(text) RETURNS text AS $$
+    SELECT public.unaccent('public.unaccent'::regdictionary, $1);
+$$ LANGUAGE SQL IMMUTABLE PARALLEL SAFE STRICT;
+"""
+
+DROP_UNACCENT_FUNCTION = """
+DROP FUNCTION api_unaccent(text);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_user_image_media_names'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_UNACCENT_FUNCTION, DROP_UNACCENT_FUNCTION),
+        migrations.RemoveIndex(
+            model_name='areaofresearch',
+            name='aor_name_trgm_gist_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='project',
+            name='project_name_trgm_gist_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='user',
+            name='user_name_trgm_gist_idx',
+        ),
+        migrations.AddIndex(
+            model_name='areaofresearch',
+            index=django.contrib.postgres.indexes.GistIndex(django.contrib.postgres.indexes.OpClass(api.models.Unaccent('name'), name='gist_trgm_ops'), name='aor_name_unaccent_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=django.contrib.postgres.indexes.GistIndex(django.contrib.postgres.indexes.OpClass(api.models.Unaccent('name'), name='gist_trgm_ops'), name='project_name_unaccent_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GistIndex(django.contrib.postgres.indexes.OpClass(api.models.Unaccent('name'), name='gist_trgm_ops'), name='user_name_unaccent_trgm_idx'),
+        ),
+    ]
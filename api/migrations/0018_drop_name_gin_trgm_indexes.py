@@ -0,0 +1,25 @@
+# Generated by Django 3.2.4 on 2026-10-18 00:30
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_name_unaccent_trgm_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='areaofresearch',
+            name='aor_name_trgm_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='project',
+            name='project_name_trgm_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='user',
+            name='user_name_trgm_idx',
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex, GistIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db.models.enums import IntegerChoices
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth.models import (
@@ -6,6 +8,15 @@ from django.contrib.auth.models import (
     BaseUserManager,
     PermissionsMixin,
 )
+from django.contrib.sessions.base_session import AbstractBaseSession
+
+class Unaccent(models.Func):
+    '''
+    Removes the accents of text with api_unaccent, the immutable wrapper of
+    unaccent created by migration 0017, which indexes can be built on
+    '''
+    function = 'api_unaccent'
+    output_field = models.TextField()
 
 class TimestampedModel(models.Model):
     # A timestamp representing when this object was created.
@@ -63,6 +74,26 @@ class Project(TimestampedModel):
     # Owner of the project, aka person with admin rights.
     head = models.ForeignKey("User", on_delete=models.CASCADE)
 
+    # Weighted full text search document built from the name (A), head's
+    # name and area of research (B) and abstract (C) of the project.
+    # Maintained by database triggers, see migration 0010.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta(TimestampedModel.Meta):
+        indexes = [
+            GinIndex(fields=["search_vector"], name="project_search_vector_idx"),
+            # Unaccented names are searched by trigram similarity, and suggested
+            # nearest to what was typed first, which only GiST finds in order
+            GistIndex(OpClass(Unaccent("name"), name="gist_trgm_ops"), name="project_name_unaccent_trgm_idx"),
+            # Pages of projects are sought on (created_at, id)
+            models.Index(fields=["-created_at", "-id"], name="project_created_id_idx"),
+        ]
+        constraints = [
+            # Names are in CONSTRAINT_ERRORS of api.controllers.project_utilities
+            models.UniqueConstraint(fields=["name"], name="unique_project_name"),
+            models.UniqueConstraint(fields=["paper_link"], name="unique_project_paper_link"),
+        ]
+
     def __str__(self):
         """Returns name of project - author"""
         # TODO
@@ -75,12 +106,18 @@ class ProjectMemberRelationship(models.Model):
     Prof who creates the Project will automatically be given the admin role.
     And No-one else can have that role."""
 
-    project = models.ForeignKey("Project", on_delete=models.CASCADE)
+    project = models.ForeignKey("Project", on_delete=models.CASCADE, related_name="members")
     user = models.ForeignKey("User", on_delete=models.CASCADE)
 
     # One cannot delete a Privilege after it has been created
     privilege = models.ForeignKey("ProjectMemberPrivilege", on_delete=models.PROTECT)
 
+    class Meta:
+        constraints = [
+            # A user is a member of a project only once
+            models.UniqueConstraint(fields=["user", "project"], name="unique_project_member"),
+        ]
+
 
 class ProjectMemberPrivilege(models.Model):
     """Different permission levels for the members
@@ -123,6 +160,11 @@ class AreaOfResearch(models.Model):
     # is to display them in department page
     department = models.ForeignKey("Department", on_delete=models.PROTECT)
 
+    class Meta:
+        indexes = [
+            GistIndex(OpClass(Unaccent("name"), name="gist_trgm_ops"), name="aor_name_unaccent_trgm_idx"),
+        ]
+
 
 class UserManager(BaseUserManager):
     """Django requires that custom users define their own Manager class. By
@@ -188,6 +230,11 @@ class User(AbstractBaseUser, PermissionsMixin, TimestampedModel):
 
     objects = UserManager()
 
+    class Meta:
+        indexes = [
+            GistIndex(OpClass(Unaccent("name"), name="gist_trgm_ops"), name="user_name_unaccent_trgm_idx"),
+        ]
+
 
 class Profile(TimestampedModel):
     """Profile Model"""
@@ -247,3 +294,17 @@ class Department(models.Model):
     short_name = models.CharField(max_length=3)
 
 
+class UserSession(AbstractBaseSession):
+    """Session Model
+    Same as django's default session table, along with the id of the user
+    the session belongs to. The user column is indexed so that all the
+    sessions of a user can be found (and deleted) without decoding
+    every session in the table."""
+
+    # Null for anonymous sessions
+    user = models.ForeignKey("User", null=True, on_delete=models.CASCADE)
+
+    @classmethod
+    def get_session_store_class(cls):
+        from api.backends.session_store import SessionStore
+        return SessionStore
@@ -0,0 +1,62 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from api.controllers.metrics_utilities import record_query
+from api.controllers.privilege_utilities import invalidate_all_privileges
+from api.controllers.reference_utilities import bump_version
+from api.controllers.search_utilities import bump_generation
+from api.models import (
+    AreaOfResearch, Department, Labs, Project, ProjectMemberPrivilege, ProjectMemberRelationship, User,
+)
+
+@receiver([post_save, post_delete], sender=ProjectMemberRelationship)
+def project_member_changed(sender, instance, **kwargs):
+    '''
+    Drops the cached privileges, in every worker
+    '''
+    invalidate_all_privileges()
+
+@receiver([post_save, post_delete], sender=ProjectMemberPrivilege)
+def privilege_changed(sender, instance, **kwargs):
+    '''
+    Drops all cached privileges, since any of them can refer to the changed row
+    '''
+    invalidate_all_privileges()
+
+@receiver([post_save, post_delete], sender=Department)
+@receiver([post_save, post_delete], sender=AreaOfResearch)
+@receiver([post_save, post_delete], sender=Labs)
+def reference_data_changed(sender, instance, **kwargs):
+    '''
+    Invalidates the cached responses of the changed table
+    '''
+    bump_version(sender)
+
+@receiver([post_save, post_delete], sender=Project)
+@receiver([post_save, post_delete], sender=AreaOfResearch)
+@receiver([post_save, post_delete], sender=Department)
+def searched_data_changed(sender, instance, **kwargs):
+    '''
+    Invalidates the cached search results and facets
+    '''
+    bump_generation()
+
+# Fields of users which search results and facets show or match on
+SEARCHED_USER_FIELDS = {'name', 'is_staff'}
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    '''
+    Invalidates the cached search results and facets, unless only fields
+    they do not use changed (eg. last_login, saved on every login)
+    '''
+    if update_fields is None or SEARCHED_USER_FIELDS & set(update_fields):
+        bump_generation()
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    '''
+    Counts and times the queries of the connection for request metrics
+    '''
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
@@ -1,3 +1,601 @@
-from django.test import TestCase
+import importlib
+import json
+import os
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, IntegrityError, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.utils.http import http_date
+from PIL import Image
+
+from api.controllers.metrics_utilities import get_route_stats
+from api.controllers.pagination_utilities import (
+    decode_cursor, encode_cursor, keyset_filter, InvalidCursor, PROJECT_ORDERING,
+)
+from api.controllers.privilege_utilities import (
+    get_privilege_code, invalidate_all_privileges, privilege_cache, NOT_A_MEMBER,
+)
+from api.controllers.project_utilities import add_members, create_project, get_privileges
+from api.controllers.search_utilities import normalize_query
+from api.controllers.serializer_utilities import get_serializer
+from api.controllers.upload_utilities import is_image
+from api.middleware.replica import ReplicaMiddleware
+from api.views import project as project_views
+from api.views.read_async import spool
+from api.models import AreaOfResearch, Department, Project, ProjectMemberRelationship, User
+
+
+class ApiTestCase(TestCase):
+    '''
+    Departments, privileges, an area of research and a staff user heading a project
+    '''
+    fixtures = ['Department', 'ProjectMemberPrivilege']
+
+    def setUp(self):
+        self.department = Department.objects.get(short_name='CSE')
+        self.aor = AreaOfResearch.objects.create(name='Robotics', slug='robotics', department=self.department)
+        self.staff = User.objects.create_user('head@nitt.edu', 'Head', 'password', is_staff=True)
+        self.project_id = self.create_project('Swarm robots')
+        # Privileges cached by an earlier test refer to rolled back rows
+        invalidate_all_privileges()
+
+    def create_project(self, name):
+        project_id, error = create_project(
+            name, 'Abstract', 'https://scholar.google.com/{}'.format(name.replace(' ', '-')),
+            self.staff.email, self.department.short_name, self.aor.name,
+        )
+        self.assertIsNone(error)
+        return project_id
+
+    def login(self, user):
+        '''
+        Logs the client in as LoginFormView does
+        '''
+        self.client.force_login(user)
+        session = self.client.session
+        session['user_id'] = user.id
+        session.save()
+
+
+class AuthenticatedQueryTests(ApiTestCase):
+    '''
+    The auth context costs the session and user queries only, once per request
+    '''
+
+    def setUp(self):
+        super().setUp()
+        self.login(self.staff)
+
+    def test_anonymous(self):
+        self.client.logout()
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/admin_user/stats')
+        self.assertEqual(json.loads(response.content)['status_code'], 401)
+
+    def test_stats(self):
+        # Session, user
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/admin_user/stats')
+        self.assertEqual(response.status_code, 200)
+
+    def test_create(self):
+        # Session, user, references, insert
+        with self.assertNumQueries(4):
+            response = self.client.post('/api/project/create/', {
+                'name': 'Underwater robots',
+                'abstract': 'Abstract',
+                'paperLink': 'https://scholar.google.com/underwater-robots',
+                'email': self.staff.email,
+                'department': self.department.short_name,
+                'areaOfResearch': self.aor.name,
+            })
+        self.assertEqual(json.loads(response.content)['status_code'], 200)
+
+    def test_write(self):
+        data = {'projectId': self.project_id, 'paperLink': 'https://scholar.google.com/1', 'abstract': 'New'}
+        # Session, user, privilege, project, update
+        with self.assertNumQueries(5):
+            response = self.client.post('/api/project/write/', data)
+        self.assertEqual(json.loads(response.content)['status_code'], 200)
+        # The privilege is cached
+        data['paperLink'] = 'https://scholar.google.com/2'
+        with self.assertNumQueries(4):
+            self.client.post('/api/project/write/', data)
+
+    def test_edit(self):
+        # Session, user, privilege, project, area of research, update
+        with self.assertNumQueries(6):
+            response = self.client.post('/api/project/edit/', {
+                'projectId': self.project_id,
+                'paperLink': 'https://scholar.google.com/1',
+                'abstract': 'New',
+                'areaOfResearch': self.aor.name,
+            })
+        self.assertEqual(json.loads(response.content)['status_code'], 200)
+
+    def test_add_members(self):
+        members = [User.objects.create_user('member{}@nitt.edu'.format(i), 'Member', 'password') for i in range(5)]
+        # Session, user, privilege, users, memberships, privileges, insert,
+        # whatever the number of members
+        with self.assertNumQueries(7):
+            response = self.client.post('/api/admin_user/add_members/', {
+                'projectId': self.project_id,
+                'members': json.dumps([{'email': member.email, 'privilege': 1} for member in members]),
+            })
+        statuses = [outcome['status'] for outcome in json.loads(response.content)['data']]
+        self.assertEqual(statuses, ['Added'] * 5)
+
+
+class PrivilegeCacheTests(ApiTestCase):
+    '''
+    Revoked memberships stop passing as soon as they are written
+    '''
+
+    def test_revoke(self):
+        membership = ProjectMemberRelationship.objects.get(project_id=self.project_id, user=self.staff)
+        code = membership.privilege.code
+        self.assertEqual(get_privilege_code(self.staff.id, self.project_id), code)
+        # Cached
+        with self.assertNumQueries(0):
+            self.assertEqual(get_privilege_code(self.staff.id, self.project_id), code)
+        # The cache of another worker is not cleared, only the shared generation is bumped
+        with mock.patch.object(privilege_cache, 'clear'):
+            membership.delete()
+        self.assertEqual(get_privilege_code(self.staff.id, self.project_id), NOT_A_MEMBER)
+
+    def test_revoked_write(self):
+        self.login(self.staff)
+        data = {'projectId': self.project_id, 'paperLink': 'https://scholar.google.com/1', 'abstract': 'New'}
+        self.assertEqual(json.loads(self.client.post('/api/project/write/', data).content)['status_code'], 200)
+        ProjectMemberRelationship.objects.filter(project_id=self.project_id, user=self.staff).delete()
+        data['paperLink'] = 'https://scholar.google.com/2'
+        self.assertNotEqual(json.loads(self.client.post('/api/project/write/', data).content)['status_code'], 200)
+
+
+class ExpandQueryTests(ApiTestCase):
+    '''
+    Listing and reading projects takes the same queries for any number of
+    projects and members, whatever the relations expanded
+    '''
+    # Queries by `expand`: the projects with their head, aor and department
+    # joined, one more for the members. Pages which are not expanded also
+    # aggregate their rows for their ETag.
+    EXPANSIONS = {
+        '': 1,
+        'head': 1,
+        'aor': 1,
+        'department': 1,
+        'members': 2,
+        'members.privilege': 2,
+        'head,aor,department,members.privilege': 2,
+    }
+
+    def add_members(self, project_ids, count):
+        users = [User.objects.create_user('member{}@nitt.edu'.format(i), 'Member', 'password') for i in range(count)]
+        ProjectMemberRelationship.objects.bulk_create(
+            ProjectMemberRelationship(project_id=project_id, user=user, privilege_id=1)
+            for project_id in project_ids for user in users
+        )
+
+    def assert_queries(self, path, params, num):
+        with self.assertNumQueries(num):
+            response = self.client.get(path, params)
+        self.assertEqual(json.loads(response.content)['status_code'], 200)
+        return json.loads(response.content)['data']
+
+    def test_projects(self):
+        for count in (1, 10):
+            if count > 1:
+                project_ids = [self.create_project('Project {}'.format(i)) for i in range(count - 1)]
+                self.add_members(project_ids, 5)
+            for expand, num in self.EXPANSIONS.items():
+                with self.subTest(projects=count, expand=expand):
+                    page = self.assert_queries('/api/projects', {'expand': expand}, num + (not expand))
+                    self.assertEqual(len(page), count)
+
+    def test_detail(self):
+        for members in (1, 10):
+            if members > 1:
+                self.add_members([self.project_id], members - 1)
+            for expand, num in self.EXPANSIONS.items():
+                with self.subTest(members=members, expand=expand):
+                    project = self.assert_queries('/api/project/detail', {'id': self.project_id, 'expand': expand}, num)
+                    if 'members' in expand:
+                        self.assertEqual(len(project['members']), members)
+
+
+class RowSerializerTests(ApiTestCase):
+    '''
+    Rows are built flat unless a relation is expanded
+    '''
+
+    def test_nested(self):
+        self.assertFalse(get_serializer(Project).nested)
+        self.assertTrue(get_serializer(Project, ('head',)).nested)
+        # One to many relations are added to the built rows
+        self.assertFalse(get_serializer(Project, ('members.user',)).nested)
+
+    def test_serialize(self):
+        flat, = get_serializer(Project).serialize(Project.objects.all())
+        self.assertEqual(flat['head'], self.staff.id)
+        expanded, = get_serializer(Project, ('head',)).serialize(Project.objects.all())
+        self.assertEqual(expanded['head'], {'id': self.staff.id, 'name': self.staff.name, 'image': ''})
+
+    def test_public_users(self):
+        # Expanded users show their public fields only, on endpoints open to anyone
+        responses = [
+            self.client.get('/api/projects', {'expand': 'head'}),
+            self.client.get('/api/project/detail', {'id': self.project_id, 'expand': 'head,members'}),
+        ]
+        projects = [json.loads(responses[0].content)['data'][0], json.loads(responses[1].content)['data']]
+        users = [project['head'] for project in projects]
+        users += [member['user'] for member in projects[1]['members']]
+        self.assertEqual(len(users), 3)
+        for user in users:
+            self.assertEqual(set(user), {'id', 'name', 'image'})
+
+
+class CursorTests(TestCase):
+    '''
+    Cursors which do not hold keys of the ordering are invalid
+    '''
+
+    def test_decode(self):
+        for keys in ([], ['2021-06-01T10:00:00+00:00', 4], [0.5, 1]):
+            self.assertEqual(decode_cursor(encode_cursor({'keys': keys}))['keys'], keys)
+        for state in ({}, [], {'keys': 1}, {'keys': [[1]]}, {'keys': [{}]}, {'keys': [None]}, {'keys': [True]}):
+            with self.subTest(state=state), self.assertRaises(InvalidCursor):
+                decode_cursor(encode_cursor(state))
+        with self.assertRaises(InvalidCursor):
+            decode_cursor('not base64!')
+
+    def test_keyset_filter(self):
+        for keys in (['yesterday', 1], ['2021-06-01T10:00:00+00:00', 'one'], [1.5, 1],
+                     ['2021-06-01T10:00:00+00:00', float('inf')], ['2021-06-01T10:00:00+00:00']):
+            with self.subTest(keys=keys), self.assertRaises(InvalidCursor):
+                keyset_filter(Project.objects.all(), PROJECT_ORDERING, keys)
+
+
+class ConditionalPageTests(ApiTestCase):
+    '''
+    Pages are answered with a 304 while their rows are unchanged,
+    and with an error for invalid cursors
+    '''
+
+    def test_not_modified(self):
+        response = self.client.get('/api/projects')
+        response = self.client.get('/api/projects', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_deleted_row(self):
+        self.create_project('Drone swarms')
+        response = self.client.get('/api/projects')
+        self.assertFalse(response.has_header('Last-Modified'))
+        # The latest updated_at of the page stays the same
+        Project.objects.get(id=self.project_id).delete()
+        for headers in ({'HTTP_IF_NONE_MATCH': response['ETag']}, {'HTTP_IF_MODIFIED_SINCE': http_date()}):
+            with self.subTest(headers=headers):
+                self.assertEqual(self.client.get('/api/projects', **headers).status_code, 200)
+
+    def test_invalid_cursor(self):
+        cursors = ['not base64!'] + [encode_cursor({'keys': keys}) for keys in (
+            ['yesterday', 1], ['2021-06-01T10:00:00+00:00', 'one'], [1], [[1], 1],
+        )]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                response = self.client.get('/api/projects', {'cursor': cursor})
+                self.assertEqual(json.loads(response.content), {'data': 'Invalid cursor', 'status_code': 400})
+
+
+class MediaTests(TestCase):
+    '''
+    Stored files are served, uploads being received are not
+    '''
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        for name in ('images/photo.txt', 'tmp/upload.txt'):
+            os.makedirs(os.path.join(media_root.name, os.path.dirname(name)), exist_ok=True)
+            with open(os.path.join(media_root.name, name), 'w') as f:
+                f.write('content')
+        overrides = self.settings(
+            MEDIA_ROOT=media_root.name, FILE_UPLOAD_TEMP_DIR=os.path.join(media_root.name, 'tmp'),
+            MEDIA_OFFLOAD='django',
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def test_stored_file(self):
+        response = self.client.get('/media/images/photo.txt')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'content')
+
+    def test_temp_file(self):
+        for path in ('tmp/upload.txt', 'images/../tmp/upload.txt', './tmp/upload.txt', 'images/..//tmp/upload.txt'):
+            with self.subTest(path=path):
+                self.assertEqual(self.client.get('/media/' + path).status_code, 404)
+
+
+class SearchTests(ApiTestCase):
+    '''
+    Misspelt queries fall back to trigram similarity, accents included
+    '''
+
+    def test_accented_typo(self):
+        self.staff.name = 'José Núñez'
+        self.staff.save()
+        for query in ('José  Núñes', 'jose nunez', 'jose nunes', 'JOSE NÚÑES'):
+            with self.subTest(query=query):
+                response = self.client.get('/api/project/search', {'query': query})
+                projects = json.loads(response.content)['data']
+                self.assertEqual([project['id'] for project in projects], [self.project_id])
+
+    def test_normalized_query(self):
+        self.assertEqual(normalize_query(' José  Núñez '), 'jose nunez')
+        self.assertEqual(normalize_query('STRAßE'), 'strasse')
+
+    def test_unaccented_suggestion(self):
+        self.staff.name = 'José Núñez'
+        self.staff.save()
+        for query in ('Núñ', 'nun'):
+            with self.subTest(query=query):
+                response = self.client.get('/api/project/suggest', {'query': query})
+                suggestions = json.loads(response.content)['data']
+                self.assertEqual(suggestions, [{'type': 'researcher', 'id': self.staff.id, 'name': 'José Núñez'}])
+
+    def test_renamed_suggestion(self):
+        for name in ('Swarm robots', 'Swarm drones'):
+            with self.subTest(name=name):
+                project = Project.objects.get(id=self.project_id)
+                project.name = name
+                project.save()
+                response = self.client.get('/api/project/suggest', {'query': 'swarm'})
+                self.assertEqual([item['name'] for item in json.loads(response.content)['data']], [name])
+
+
+class ReferenceCacheTests(ApiTestCase):
+    '''
+    Cached reference data is invalidated by writes to its table
+    '''
+
+    def get_short_names(self):
+        response = self.client.get('/api/department')
+        return {department['short_name'] for department in json.loads(response.content)['data']}
+
+    def test_departments(self):
+        self.assertNotIn('NEW', self.get_short_names())
+        with self.assertNumQueries(0):
+            self.get_short_names()
+        Department.objects.create(full_name='New Department', short_name='NEW')
+        self.assertIn('NEW', self.get_short_names())
+
+
+class RequestMetricsTests(ApiTestCase):
+    '''
+    Queries are counted per route, streamed ones included
+    '''
+
+    def test_streamed_queries(self):
+        requests = get_route_stats().get('api:project-export', {}).get('requests', 0)
+        response = self.client.get('/api/project/export')
+        # Counted once the rows are sent
+        self.assertEqual(get_route_stats().get('api:project-export', {}).get('requests', 0), requests)
+        rows = json.loads(b''.join(response.streaming_content))['data']
+        self.assertEqual([row['id'] for row in rows], [self.project_id])
+        stats = get_route_stats()['api:project-export']
+        self.assertEqual(stats['requests'], requests + 1)
+        # The ETag aggregate before the response, the rows while it is sent
+        self.assertGreaterEqual(stats['max_queries'], 2)
+
+
+class SpooledExportTests(ApiTestCase):
+    '''
+    Under ASGI the export is written to a file in the view's thread
+    '''
+
+    def test_spooled_export(self):
+        self.create_project('Drone swarms')
+        view = spool(project_views.Export.as_view())
+        with self.settings(STREAM_SPOOL_SIZE=16):
+            response = view(RequestFactory().get('/api/project/export'))
+        self.assertTrue(response.has_header('ETag'))
+        content = b''.join(response.streaming_content)
+        self.assertEqual(int(response['Content-Length']), len(content))
+        self.assertEqual(len(json.loads(content)['data']), 2)
+
+
+class ImportProjectsTests(ApiTestCase):
+    '''
+    Valid rows are imported, the others reported
+    '''
+
+    def import_rows(self, rows):
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as f:
+            f.write('\n'.join(json.dumps(row) for row in rows))
+        self.addCleanup(os.remove, f.name)
+        errors = StringIO()
+        call_command('import_projects', f.name, stdout=StringIO(), stderr=errors)
+        return errors.getvalue().splitlines()
+
+    def test_jsonl(self):
+        row = {
+            'name': 'Imported project',
+            'abstract': 'Abstract',
+            'paperLink': 'https://scholar.google.com/imported',
+            'department': self.department.short_name,
+            'areaOfResearch': self.aor.name,
+            'email': self.staff.email,
+        }
+        errors = self.import_rows([
+            dict(row, name=42),
+            dict(row, abstract=['not', 'a', 'string']),
+            dict(row, email={'address': self.staff.email}),
+            row,
+        ])
+        self.assertEqual(errors, ['Row 1: Invalid name', 'Row 2: Invalid abstract', 'Row 3: Invalid email'])
+        self.assertTrue(Project.objects.filter(name='Imported project', head=self.staff).exists())
+
+    def test_long_paper_link(self):
+        row = {
+            'abstract': 'Abstract',
+            'department': self.department.short_name,
+            'areaOfResearch': self.aor.name,
+            'email': self.staff.email,
+        }
+        errors = self.import_rows([
+            dict(row, name='Long link', paperLink='https://scholar.google.com/' + 'a' * 200),
+            dict(row, name='Short link', paperLink='https://scholar.google.com/short'),
+        ])
+        self.assertEqual(errors, ["Row 1: Google scholar's link is too long"])
+        # The rest of the batch is imported
+        self.assertEqual(list(Project.objects.filter(name__endswith=' link').values_list('name', flat=True)), ['Short link'])
+
+
+class AddMembersTests(ApiTestCase):
+    '''
+    Members are added once, the outcome of every pair is reported
+    '''
+
+    def test_outcomes(self):
+        member, other = [User.objects.create_user('member{}@nitt.edu'.format(i), 'Member', 'password') for i in range(2)]
+        ProjectMemberRelationship.objects.create(project_id=self.project_id, user=other, privilege_id=1)
+        outcomes = add_members(self.project_id, [
+            (member.email, 1), (member.email, 2), (other.email, 1), (self.staff.email, 4), ('nobody@nitt.edu', 1),
+        ])
+        self.assertEqual([outcome['status'] for outcome in outcomes], [
+            'Added', 'Already a member', 'Already a member', 'Invalid privilege', 'User does not exist',
+        ])
+
+    def test_added_concurrently(self):
+        member, other = [User.objects.create_user('member{}@nitt.edu'.format(i), 'Member', 'password') for i in range(2)]
+        privileges = get_privileges()
+
+        def add_other():
+            # Another request adds `other` after the memberships were read
+            ProjectMemberRelationship.objects.create(project_id=self.project_id, user=other, privilege_id=1)
+            return privileges
+
+        with mock.patch('api.controllers.project_utilities.get_privileges', side_effect=add_other):
+            outcomes = add_members(self.project_id, [(member.email, 1), (other.email, 2)])
+        self.assertEqual([outcome['status'] for outcome in outcomes], ['Added', 'Already a member'])
+        self.assertEqual(
+            set(ProjectMemberRelationship.objects.filter(project_id=self.project_id).values_list('user_id', 'privilege_id')),
+            {(self.staff.id, 4), (member.id, 1), (other.id, 1)},
+        )
+
+
+class ImageUploadTests(ApiTestCase):
+    '''
+    Uploads are images of the format of their extension, stored images
+    are named relative to the media root
+    '''
+
+    def upload(self, name, image_format):
+        content = BytesIO()
+        Image.new('RGB', (4, 4)).save(content, image_format)
+        return SimpleUploadedFile(name, content.getvalue())
+
+    def test_is_image(self):
+        cases = [
+            (self.upload('photo.png', 'PNG'), True),
+            (self.upload('photo.JPG', 'JPEG'), True),
+            (self.upload('photo.png', 'GIF'), False),
+            (self.upload('photo.txt', 'PNG'), False),
+            (SimpleUploadedFile('photo.png', b'<svg onload="alert(1)"/>'), False),
+            (SimpleUploadedFile('photo.png', self.upload('photo.png', 'PNG').read()[:40]), False),
+        ]
+        for uploaded, valid in cases:
+            with self.subTest(name=uploaded.name, valid=valid):
+                self.assertEqual(is_image(uploaded), valid)
+                # Stored from the start
+                self.assertEqual(uploaded.tell(), 0)
+
+    def test_migrate_image_urls(self):
+        migration = importlib.import_module('api.migrations.0016_user_image_media_names')
+        self.staff.image = '/media/media/documents/my%20photo.png'
+        self.staff.save()
+        migration.urls_to_names(apps, None)
+        self.staff.refresh_from_db()
+        self.assertEqual(self.staff.image.name, 'media/documents/my photo.png')
+        migration.names_to_urls(apps, None)
+        self.staff.refresh_from_db()
+        self.assertEqual(self.staff.image.name, '/media/media/documents/my%20photo.png')
+
+
+class ProjectUpdateTests(ApiTestCase):
+    '''
+    Updates report the constraint they violate, and only that
+    '''
+
+    def setUp(self):
+        super().setUp()
+        self.login(self.staff)
+        self.create_project('Drone swarms')
+
+    def update(self, path, **data):
+        data = dict({'projectId': self.project_id, 'abstract': 'New', 'areaOfResearch': self.aor.name}, **data)
+        # Failed statements roll back to the savepoint, instead of breaking the test's transaction
+        with transaction.atomic():
+            return json.loads(self.client.post(path, data).content)
+
+    def test_errors(self):
+        for path in ('/api/project/write/', '/api/project/edit/'):
+            with self.subTest(path=path):
+                response = self.update(path, paperLink='https://scholar.google.com/Drone-swarms')
+                self.assertEqual(response, {'data': "Google scholar's link already exists", 'status_code': 400})
+                response = self.update(path)
+                self.assertEqual(response, {'data': "Google scholar's link is required", 'status_code': 400})
+                response = self.update(path, paperLink='https://scholar.google.com/1')
+                self.assertEqual(response['status_code'], 200)
+                # Violations of other constraints are errors, not reported as a duplicate link
+                with mock.patch.object(Project, 'save', side_effect=IntegrityError('null value in column "abstract"')):
+                    response = self.update(path, paperLink='https://scholar.google.com/1')
+                self.assertEqual(response['status_code'], 500)
+
+
+class DuplicateProjectsTests(ApiTestCase):
+    '''
+    Projects saved twice before the unique constraints stop their migration
+    '''
+
+    def test_check_duplicates(self):
+        migration = importlib.import_module('api.migrations.0013_unique_project_name_paper_link')
+        migration.check_duplicates(apps, None)
+        with connection.cursor() as cursor:
+            # Checks the deferred foreign keys of setUp's rows, which would block the ALTER
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+            cursor.execute('ALTER TABLE api_project DROP CONSTRAINT unique_project_paper_link')
+        duplicate = Project.objects.get(id=self.project_id)
+        duplicate.pk = None
+        duplicate.name = 'Swarm robots (copy)'
+        duplicate.save()
+        message = "paper_link 'https://scholar.google.com/Swarm-robots': projects {}, {}".format(
+            self.project_id, duplicate.id,
+        )
+        with self.assertRaisesMessage(IntegrityError, message):
+            migration.check_duplicates(apps, None)
+
+
+class ReplicaPinTests(ApiTestCase):
+    '''
+    Requests which write pin the client to the primary
+    '''
+
+    def test_create_project_pins_client(self):
+        def view(request):
+            return HttpResponse(str(self.create_project('Underwater robots')))
+
+        # Any replica enables the middleware, the router never reads from it
+        # since the request is a POST
+        with self.settings(DATABASES=dict(settings.DATABASES, replica1=settings.DATABASES['default'])):
+            middleware = ReplicaMiddleware(view)
+        response = middleware(RequestFactory().post('/api/project/create/'))
+        self.assertIn(settings.REPLICA_PIN_COOKIE, response.cookies)
@@ -1,9 +1,34 @@
+from django.conf import settings
 from django.conf.urls import url
-from .views import user, admin_user, project, home
+from .views import user, admin_user, project, home, read_async
 
 # namespacing app
 app_name = 'api'
 
+# Read only views, served by their async versions under ASGI
+if settings.ASYNC_READ_VIEWS:
+    read_views = {
+        'projects': read_async.projects,
+        'detail': read_async.detail,
+        'search': read_async.search,
+        'suggest': read_async.suggest,
+        'export': read_async.export,
+        'aors': read_async.aors,
+        'departments': read_async.departments,
+        'centers': read_async.centers,
+    }
+else:
+    read_views = {
+        'projects': project.AllProjects.as_view(),
+        'detail': project.Detail.as_view(),
+        'search': project.Search.as_view(),
+        'suggest': project.Suggest.as_view(),
+        'export': project.Export.as_view(),
+        'aors': home.AllAor.as_view(),
+        'departments': home.AllDepartments.as_view(),
+        'centers': home.AllCenters.as_view(),
+    }
+
 urlpatterns = [
 
     # User-auth routes
@@ -19,11 +44,18 @@ urlpatterns = [
     url('admin_user/update_roles/', admin_user.AssignRoles.as_view(), name='update-roles'),
     url('admin_user/create_tags/', admin_user.CreateTags.as_view(), name='create-tags'),
     url('admin_user/add_members/', admin_user.AddMembers.as_view(), name='add-members'),
+    url('admin_user/stats', admin_user.Stats.as_view(), name='request-stats'),
 
     # Project routes
     #search route: pass a parameter type (name, prof, interest, tag) and value
-    url('projects', project.AllProjects.as_view(), name='projects-all'),
-    url('project/search', project.Search.as_view(), name='search'),
+    url('projects', read_views['projects'], name='projects-all'),
+    url('project/search', read_views['search'], name='search'),
+    # autocomplete of the search box
+    url('project/suggest', read_views['suggest'], name='suggest'),
+    # a project, ?expand=head,aor,department,members,members.privilege
+    url('project/detail', read_views['detail'], name='project-detail'),
+    # streams every project in one response
+    url('project/export', read_views['export'], name='project-export'),
     # create route 
     url('project/create', project.Create.as_view(), name='project-create'),
     # edit route 
@@ -34,9 +66,9 @@ urlpatterns = [
     url('project/tags', project.Tags.as_view(), name='tags'),
     
     #AOR
-    url('aor', home.AllAor.as_view(), name='aor-all'),
+    url('aor', read_views['aors'], name='aor-all'),
     #Departments
-    url('department', home.AllDepartments.as_view(), name='departments-all'),
+    url('department', read_views['departments'], name='departments-all'),
     #Centers
-    url('center', home.AllCenters.as_view(), name='centers-all'),
+    url('center', read_views['centers'], name='centers-all'),
 ]
@@ -1,4 +1,18 @@
+from django.conf import settings
+from django.utils.decorators import method_decorator
 from django.views.generic import View
+from api.backends.pooled_postgresql.base import get_pool_stats
+from api.controllers.metrics_utilities import get_route_stats
+from api.controllers.privilege_utilities import privilege_cache
+from api.controllers.project_utilities import add_members
+from api.controllers.reference_utilities import reference_cache
+from api.controllers.search_utilities import facet_cache, search_cache, suggest_cache
+from api.controllers.response_format import error_response
+from api.decorators.permissions import CheckAccessPrivilegeDec, IsStaffDec
+from api.decorators.response import JsonResponseDec
+from api.models import ProjectMemberPrivilege
+import json
+import os
 
 class AllUsers(View):
     def post(self, req):
@@ -16,6 +30,49 @@ class CreateTags(View):
     def post(self, req):
         pass
 
+@method_decorator(JsonResponseDec, name='dispatch')
+@method_decorator(CheckAccessPrivilegeDec, name='dispatch')
 class AddMembers(View):
+    """
+        Adds members to a project if user has "Admin" access.
+        `members` is a JSON list of {"email": ..., "privilege": <privilege code>}
+    """
     def post(self, req):
-        pass
+        project_id = int(req.POST.get("projectId"))
+        if req.access_privilege != ProjectMemberPrivilege.AvailablePrivileges.ADMIN:
+            return error_response("USER DOESN'T HAVE ADMIN ACCESS")
+        try:
+            members = [
+                (str(member['email']).strip(), int(member['privilege']))
+                for member in json.loads(req.POST.get("members", ""))
+            ]
+        except (ValueError, TypeError, KeyError):
+            return error_response("Invalid members")
+        if len(members) > settings.MAX_MEMBERS_PER_REQUEST:
+            return error_response("Too many members")
+        return add_members(project_id, members)
+
+@method_decorator(JsonResponseDec, name='dispatch')
+@method_decorator(IsStaffDec, name='dispatch')
+class Stats(View):
+    """
+        Returns the request metrics per route, the database pool and
+        cache stats of the worker process serving the request. Staff only.
+        Every worker (`pid`) counts its own requests and cache hits, so the
+        numbers of a deployment are the sum over its workers.
+    """
+    def get(self, req):
+        if not req.is_staff:
+            return error_response("PERMISSION DENIED")
+        return {
+            'pid': os.getpid(),
+            'routes': get_route_stats(),
+            'db_pools': get_pool_stats(),
+            'caches': {
+                'privileges': privilege_cache.stats(),
+                'reference': reference_cache.stats(),
+                'search': search_cache.stats(),
+                'facets': facet_cache.stats(),
+                'suggestions': suggest_cache.stats(),
+            },
+        }
@@ -2,17 +2,34 @@ from api.models import AreaOfResearch, Department, Labs
 from django.views.generic import View
 from django.http import HttpResponse
 from api.decorators.response import JsonResponseDec
+from api.controllers.pagination_utilities import get_cursor, get_page_size, paginate, InvalidCursor, ID_ORDERING
+from api.controllers.reference_utilities import cached_response
+from api.controllers.response_format import error_response
 from django.utils.decorators import method_decorator
-from django.forms.models import model_to_dict
+from api.controllers.serializer_utilities import get_serializer
 
-def list_to_dict(items):
+def reference_page(req, model):
     '''
-    Converts a given QuerySet into a list of dictionaries
+    Returns a page of a reference data table, served from
+    the reference cache until the table changes
     '''
-    converted = []
-    for item in items:
-        converted.append(model_to_dict(item))
-    return converted
+    cursor = req.GET.get('cursor')
+    page_size = get_page_size(req)
+
+    def build():
+        try:
+            rows, next_cursor = paginate(
+                model.objects.all(), ID_ORDERING, get_cursor(req), page_size,
+                serializer=get_serializer(model),
+            )
+        except InvalidCursor:
+            return error_response("Invalid cursor")
+        return {
+            'data': rows,
+            'next': next_cursor,
+        }
+
+    return cached_response(req, model, (cursor, page_size), build)
 
 @method_decorator(JsonResponseDec, name='dispatch')
 class AllDepartments(View):
@@ -21,10 +38,7 @@ class AllDepartments(View):
     short_name and name
     """
     def get(self, req):
-        departments = Department.objects.all()
-        return {
-            'data': list_to_dict(departments)
-        }
+        return reference_page(req, Department)
 
 @method_decorator(JsonResponseDec, name='dispatch') 
 class AllAor(View):
@@ -33,10 +47,7 @@ class AllAor(View):
     short_name and name
     """
     def get(self, req):
-        aors = AreaOfResearch.objects.all()
-        return {
-            'data': list_to_dict(aors)
-        }
+        return reference_page(req, AreaOfResearch)
 
 @method_decorator(JsonResponseDec, name='dispatch') 
 class AllCenters(View):
@@ -44,7 +55,4 @@ class AllCenters(View):
     Return all Labs/Centers of Excellence
     """
     def get(self, req):
-        labs = Labs.objects.all()
-        return {
-            'data': list_to_dict(labs)
-        }
+        return reference_page(req, Labs)
@@ -0,0 +1,103 @@
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_etags, quote_etag
+from django.views.generic import View
+from django.views.static import was_modified_since
+import mimetypes
+import os
+import re
+
+# Content addressed images (and their variants), see upload_utilities.store_image.
+# Their content never changes, so clients can cache them forever.
+IMMUTABLE_NAME = re.compile(r'^images/[0-9a-f]{2}/(?P<hash>[0-9a-f]{64})(_\d+)?\.\w+$')
+RANGE = re.compile(r'^bytes=(?P<start>\d*)-(?P<end>\d*)$')
+
+def offload_response(full_path, name):
+    '''
+    Returns an empty response which tells the server in front of django
+    to send the file itself, so the file is never read in python.
+    uwsgi serves the X-Sendfile header, nginx the X-Accel-Redirect header
+    (pointing to an internal location aliased to MEDIA_ROOT).
+    Both handle Range requests.
+    '''
+    response = HttpResponse()
+    if settings.MEDIA_OFFLOAD == 'uwsgi':
+        response['X-Sendfile'] = full_path
+    else:
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX + name
+    return response
+
+def file_response(req, full_path, size):
+    '''
+    Sends the file from django, for local development. Single byte ranges are
+    supported, other Range headers get the whole file.
+    '''
+    match = RANGE.match(req.META.get('HTTP_RANGE', ''))
+    if match is None or not (match['start'] or match['end']):
+        response = FileResponse(open(full_path, 'rb'))
+        response['Accept-Ranges'] = 'bytes'
+        return response
+
+    if match['start']:
+        start = int(match['start'])
+        end = min(int(match['end']), size - 1) if match['end'] else size - 1
+    else:
+        # Suffix range, the last n bytes
+        start = max(0, size - int(match['end']))
+        end = size - 1
+    if start > end:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = 'bytes */{}'.format(size)
+        return response
+
+    with open(full_path, 'rb') as f:
+        f.seek(start)
+        response = HttpResponse(f.read(end - start + 1), status=206)
+    response['Content-Range'] = 'bytes {}-{}/{}'.format(start, end, size)
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+class Media(View):
+    """
+    Serves uploaded files from MEDIA_ROOT. Conditional requests are
+    answered here, the file itself is handed to the server (MEDIA_OFFLOAD).
+    """
+    def get(self, req, path):
+        try:
+            full_path = safe_join(settings.MEDIA_ROOT, path)
+            stat = os.stat(full_path)
+        except (ValueError, OSError):
+            raise Http404('File does not exist')
+        # Uploads being received are kept private, however the path spells them
+        temp_dir = os.path.realpath(settings.FILE_UPLOAD_TEMP_DIR)
+        if not os.path.isfile(full_path) or os.path.commonpath([os.path.realpath(full_path), temp_dir]) == temp_dir:
+            raise Http404('File does not exist')
+
+        immutable = IMMUTABLE_NAME.match(path)
+        if immutable:
+            etag = quote_etag(immutable['hash'])
+            cache_control = 'public, max-age={}, immutable'.format(settings.MEDIA_IMMUTABLE_MAX_AGE)
+        else:
+            etag = quote_etag('{:x}-{:x}'.format(int(stat.st_mtime), stat.st_size))
+            cache_control = 'public, max-age={}'.format(settings.MEDIA_MAX_AGE)
+
+        if_none_match = parse_etags(req.META.get('HTTP_IF_NONE_MATCH', ''))
+        if etag in if_none_match or '*' in if_none_match or (
+            not if_none_match
+            and 'HTTP_IF_MODIFIED_SINCE' in req.META
+            and not was_modified_since(req.META['HTTP_IF_MODIFIED_SINCE'], stat.st_mtime, stat.st_size)
+        ):
+            response = HttpResponseNotModified()
+        elif settings.MEDIA_OFFLOAD in ('uwsgi', 'nginx'):
+            response = offload_response(full_path, path)
+        else:
+            response = file_response(req, full_path, stat.st_size)
+
+        content_type, _ = mimetypes.guess_type(full_path)
+        if response.status_code != 304:
+            response['Content-Type'] = content_type or 'application/octet-stream'
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        response['Cache-Control'] = cache_control
+        return response
@@ -2,43 +2,118 @@ from django.utils.decorators import method_decorator
 from django.views.generic import View
 from api.decorators.response import JsonResponseDec
 from api.decorators.permissions import IsStaffDec, CheckAccessPrivilegeDec
-from api.models import AreaOfResearch, Department, Project, User
+from api.decorators.conditional import ConditionalPageDec
+from api.models import AreaOfResearch, Project, ProjectMemberPrivilege
 from api.controllers.response_format import error_response
-from api.controllers.project_utilities import create_project
-from django.db.models import Q
+from api.controllers.project_utilities import constraint_error, create_project, get_project_expand
+from api.controllers.pagination_utilities import get_cursor, get_page_size, paginate, InvalidCursor, PROJECT_ORDERING
+from api.controllers.search_utilities import get_facet_filters, search_projects, suggest
+from api.controllers.serializer_utilities import get_serializer
+from django.conf import settings
+from django.db import IntegrityError
 import logging
 
 logger = logging.getLogger(__name__)
-from django.forms.models import model_to_dict
-
-def list_to_dict(items):
-    '''
-    Converts a given QuerySet into a list of dictionaries
-    '''
-    converted = []
-    for item in items:
-        converted.append(model_to_dict(item))
-    return converted
 
+@method_decorator(ConditionalPageDec(Project.objects.all, PROJECT_ORDERING), name='dispatch')
 @method_decorator(JsonResponseDec, name='dispatch')
 class AllProjects(View):
     """
-    Return all Projects
+    Return all Projects, newest first, one page at a time,
+    with the relations in `expand` (see PROJECT_EXPANSIONS)
     """
     def get(self, req):
-        projects = Project.objects.all()
+        try:
+            expand = get_project_expand(req)
+        except ValueError:
+            return error_response("Invalid expand")
+        try:
+            projects, next_cursor = paginate(
+                Project.objects.all(), PROJECT_ORDERING, get_cursor(req), get_page_size(req),
+                serializer=get_serializer(Project, expand),
+            )
+        except InvalidCursor:
+            return error_response("Invalid cursor")
         return {
-            'data': list_to_dict(projects)
+            'data': projects,
+            'next': next_cursor,
         }
 
+@method_decorator(JsonResponseDec, name='dispatch')
+class Detail(View):
+    """
+    Return the Project of `id`, with the relations in `expand`
+    (see PROJECT_EXPANSIONS). Reads the project and its head, aor and
+    department in one query, and its members in one more.
+    """
+    def get(self, req):
+        try:
+            project_id = int(req.GET.get("id", ""))
+            expand = get_project_expand(req)
+        except ValueError:
+            return error_response("Invalid project or expand")
+        projects = get_serializer(Project, expand).serialize(Project.objects.filter(id=project_id))
+        if not projects:
+            return error_response("Project doesn't exist")
+        return projects[0]
+
+@method_decorator(ConditionalPageDec(Project.objects.all, PROJECT_ORDERING, paginated=False), name='dispatch')
+@method_decorator(JsonResponseDec, name='dispatch')
+class Export(View):
+    """
+    Streams all Projects, newest first, in a single response
+    """
+    def get(self, req):
+        return Project.objects.order_by(*PROJECT_ORDERING)
+
 @method_decorator(JsonResponseDec, name='dispatch')
 class Search(View):
+    """
+    Return Projects matching the query, most relevant first.
+    Narrowed by the department, aor and head ids if given.
+    The first page comes with the number of matches per
+    department, area of research and head.
+    """
     def get(self, req):
-        query = req.GET.get("query")
-        projects = Project.objects.filter(Q(head__name__unaccent__icontains = query) | Q(name__unaccent__icontains=query)| Q(aor__name__unaccent__icontains=query))
-        return {
-            'data': list_to_dict(projects)
+        query = req.GET.get("query", "").strip()
+        if not query:
+            return error_response("Search query cannot be empty")
+        try:
+            filters = get_facet_filters(req)
+        except ValueError:
+            return error_response("Invalid filter")
+        try:
+            cursor = get_cursor(req)
+            projects, next_cursor, facets = search_projects(
+                query, cursor, get_page_size(req), filters, facets=cursor is None,
+            )
+        except InvalidCursor:
+            return error_response("Invalid cursor")
+        response = {
+            'data': projects,
+            'next': next_cursor,
         }
+        if facets is not None:
+            response['facets'] = facets
+        return response
+
+@method_decorator(JsonResponseDec, name='dispatch')
+class Suggest(View):
+    """
+    Return projects, areas of research and researchers whose
+    names contain the query, for autocompleting the search box
+    """
+    def get(self, req):
+        query = req.GET.get("query", "").strip()
+        if len(query) < settings.SUGGEST_MIN_LENGTH:
+            return []
+        try:
+            limit = min(int(req.GET.get("limit", settings.SUGGEST_LIMIT)), settings.MAX_SUGGEST_LIMIT)
+        except ValueError:
+            return error_response("Invalid limit")
+        if limit < 1:
+            return error_response("Invalid limit")
+        return suggest(query, limit)
 
 class Tags(View):
     def get(self, req):
@@ -48,7 +123,8 @@ class Tags(View):
 @method_decorator(IsStaffDec, name='dispatch')
 class Create(View):
     """
-        Creates a project if user has admin access and project details (link and name) are unique
+        Creates a project if user has admin access and project details (link and name) are unique.
+        Takes two queries, the uniqueness is checked by the database.
     """
     def post(self, req):
         name = req.POST.get("name")
@@ -60,36 +136,16 @@ class Create(View):
         
         if not req.is_staff:
             return error_response("PERMISSION DENIED TO CREATE PROJECTS")
+
         try:
-            user = User.objects.get(email=head)
-        except User.DoesNotExist:
-            return error_response("User does not exist")
-        
-        if Project.objects.filter(paper_link=paper_link).exists():
-            return error_response("Google scholar's link already exists")
-        
-        if Project.objects.filter(name=name).exists():
-            return error_response("A project with the same name exists! Please switch to a new project name")
-        
-        try:
-            department_obj = Department.objects.get(short_name=department)
-        except Department.DoesNotExist:
-            return error_response("Department doesn't exist")
-        
-        try:
-            aor_obj = AreaOfResearch.objects.get(name = aor)
-        except AreaOfResearch.DoesNotExist:
-            return error_response("Please select from the given areas of research")
-        
-        try:
-            if create_project(name, abstract, paper_link, user, department_obj, aor_obj):
-                logger.info('Project(name={}) creation successful'.format(name))
-                return "Project created successfully!"
-            else:
-                return error_response("Invalid details")
+            project_id, error = create_project(name, abstract, paper_link, head, department, aor)
         except Exception as e:
             logger.error(e)
             return error_response("Project creation failed")
+        if error:
+            return error_response(error)
+        logger.info('Project(name={}) creation successful'.format(name))
+        return "Project created successfully!"
 
 @method_decorator(JsonResponseDec, name='dispatch')
 @method_decorator(CheckAccessPrivilegeDec, name='dispatch')
@@ -103,13 +159,22 @@ class Write(View):
         project_id = req.POST.get("projectId")
         paper_link = req.POST.get("paperLink")
         abstract = req.POST.get("abstract")
-        if not (req.access_privilege == "Write" or req.access_privilege == "Admin" ):
+        privileges = ProjectMemberPrivilege.AvailablePrivileges
+        if req.access_privilege not in (privileges.WRITE, privileges.ADMIN):
             return error_response("USER DOESN'T HAVE WRITE ACCESS")
+        if not paper_link:
+            return error_response("Google scholar's link is required")
         try:
             project = Project.objects.get(id=project_id)
             project.paper_link = paper_link
             project.abstract = abstract
-            project.save()
+            try:
+                project.save()
+            except IntegrityError as e:
+                error = constraint_error(e)
+                if error is None:
+                    raise
+                return error_response(error)
             logger.info('Project(name={}) update successful'.format(project.name))
             return "Project updated successfully!"
         except Project.DoesNotExist:
@@ -129,8 +194,11 @@ class Edit(View):
         paper_link = req.POST.get("paperLink")
         abstract = req.POST.get("abstract")
         aor = req.POST.get("areaOfResearch")
-        if not (req.access_privilege == "Edit" or req.access_privilege == "Admin" ):
+        privileges = ProjectMemberPrivilege.AvailablePrivileges
+        if req.access_privilege not in (privileges.EDIT, privileges.ADMIN):
             return error_response("USER DOESN'T HAVE EDIT ACCESS")
+        if not paper_link:
+            return error_response("Google scholar's link is required")
         try:
             project = Project.objects.get(id=project_id)
             project.paper_link = paper_link
@@ -140,7 +208,13 @@ class Edit(View):
                 project.area_of_research = aor_obj
             except AreaOfResearch.DoesNotExist:
                 return error_response("Please select from the given areas of research")
-            project.save()
+            try:
+                project.save()
+            except IntegrityError as e:
+                error = constraint_error(e)
+                if error is None:
+                    raise
+                return error_response(error)
             logger.info('Project(name={}) update successful'.format(project.name))
             return "Project updated successfully!"
         except Project.DoesNotExist:
@@ -0,0 +1,66 @@
+"""
+Async versions of the read only views, used when serving over ASGI.
+The ORM is synchronous, so each view runs its synchronous counterpart in
+a thread of the executor pool. Slow queries then hold an executor thread
+instead of a server worker, and the event loop keeps accepting requests.
+"""
+import tempfile
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import FileResponse
+from api.views import home, project
+
+def offload(view):
+    """
+    Returns an async view running `view` in a thread of its own
+    """
+
+    def run(request, *args, **kwargs):
+        # Executor threads keep their own connections, the request
+        # signals which close them only run on the main thread
+        close_old_connections()
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            close_old_connections()
+
+    run_in_thread = sync_to_async(run, thread_sensitive=False)
+
+    async def async_view(request, *args, **kwargs):
+        return await run_in_thread(request, *args, **kwargs)
+
+    return async_view
+
+def spool(view):
+    """
+    Returns `view` with its streamed responses written to a temporary file
+    before they are sent. Django's ASGI handler reads streamed responses in
+    the event loop, where the queries producing their rows cannot run, the
+    file is read there instead.
+    """
+
+    def spooled_view(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if not response.streaming:
+            return response
+        content = tempfile.SpooledTemporaryFile(max_size=settings.STREAM_SPOOL_SIZE)
+        for chunk in response.streaming_content:
+            content.write(chunk)
+        spooled = FileResponse(content, status=response.status_code)
+        for header, value in response.items():
+            spooled[header] = value
+        spooled['Content-Length'] = content.tell()
+        content.seek(0)
+        return spooled
+
+    return spooled_view
+
+projects = offload(project.AllProjects.as_view())
+detail = offload(project.Detail.as_view())
+search = offload(project.Search.as_view())
+suggest = offload(project.Suggest.as_view())
+export = offload(spool(project.Export.as_view()))
+aors = offload(home.AllAor.as_view())
+departments = offload(home.AllDepartments.as_view())
+centers = offload(home.AllCenters.as_view())
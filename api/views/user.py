@@ -5,7 +5,7 @@ from api.controllers.user_utilities import *
 from api.models import User
 from api.decorators.response import JsonResponseDec
 from django.utils.decorators import method_decorator
-from django.core.files.storage import FileSystemStorage
+from api.controllers.upload_utilities import is_image, store_image
 import logging
 
 logger = logging.getLogger(__name__)
@@ -66,12 +66,12 @@ class RegisterFormView(View):
         password = req.POST.get('password')
         name = req.POST.get('name')
         is_staff = True
-        
-        myfile = req.FILES['profile_pic']
-        fs = FileSystemStorage()
-        filename = fs.save(myfile.name, myfile)
-        uploaded_file_url = fs.url(filename)
-        print(uploaded_file_url)
+
+        # Streamed to a temporary file, which is removed at the end of
+        # the request unless the registration goes through
+        profile_pic = req.FILES.get('profile_pic')
+        if profile_pic is not None and not is_image(profile_pic):
+            return error_response("Profile picture must be an image")
         
         if "@nitt.edu" not in email:
             return error_response("Please use webmail")
@@ -80,7 +80,8 @@ class RegisterFormView(View):
             if email.split("@")[0].isnumeric():
                 is_staff = False
             if not User.objects.filter(email=email).exists():
-                register_user(email, name, password, is_staff, uploaded_file_url)
+                image = store_image(profile_pic) if profile_pic is not None else None
+                register_user(email, name, password, is_staff, image)
                 logger.info('User(webmail={}) Registration successful'.format(email))
                 return "Registration Successful!"
             else:
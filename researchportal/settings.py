@@ -48,12 +48,17 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.instrumentation.RequestMetricsMiddleware',
+    'api.middleware.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'api.middleware.ratelimit.RateLimitMiddleware',
+    'api.middleware.replica.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     # 'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api.middleware.auth.AuthContextMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -65,6 +70,10 @@ CORS_ALLOWED_ORIGIN_REGEXES = [
 ]
 
 AUTH_USER_MODEL = 'api.User'
+
+# Sessions are stored in `api.UserSession`, which indexes the owner of each
+# session so that a user's sessions can be removed in a single query
+SESSION_ENGINE = 'api.backends.session_store'
 ROOT_URLCONF = 'researchportal.urls'
 
 TEMPLATES = [
@@ -89,17 +98,51 @@ WSGI_APPLICATION = 'researchportal.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# DB_POOL keeps connections open in a pool per process, which the threads
+# of the process share (api/backends/pooled_postgresql)
+DB_POOL = os.environ.get('DB_POOL', 'False') == 'True'
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'api.backends.pooled_postgresql' if DB_POOL else 'django.db.backends.postgresql',
         'NAME': os.environ.get('POSTGRES_DB', 'research_portal'),
         'USER': os.environ.get('POSTGRES_USER', 'postgres'),
         'PASSWORD': os.environ.get('POSTGRES_PASSWORD', 'postgres'),
         'HOST': os.environ.get('POSTGRES_HOST', 'db'),
-        'PORT': 5432,
+        'PORT': int(os.environ.get('POSTGRES_PORT', 5432)),
+        'POOL': {
+            'SIZE': int(os.environ.get('DB_POOL_SIZE', 4)),
+            'MAX_LIFETIME': int(os.environ.get('DB_POOL_MAX_LIFETIME', 1800)),
+            'CHECK_AFTER': int(os.environ.get('DB_POOL_CHECK_AFTER', 10)),
+            'TIMEOUT': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        },
+        # Server side cursors (QuerySet.iterator) do not work behind
+        # pgbouncer in transaction mode
+        'DISABLE_SERVER_SIDE_CURSORS': (
+            os.environ.get('DB_DISABLE_SERVER_SIDE_CURSORS', 'False') == 'True'
+        ),
     }
 }
 
+# Comma separated host[:port] of read replicas of the database. Reads of
+# GET requests go to a replica (api/middleware/replica.py), for
+# REPLICA_PIN_SECONDS after a client writes its reads stay on the primary
+REPLICA_HOSTS = [
+    host.strip() for host in os.environ.get('POSTGRES_REPLICA_HOSTS', '').split(',') if host.strip()
+]
+for i, replica in enumerate(REPLICA_HOSTS, start=1):
+    host, _, port = replica.partition(':')
+    DATABASES[f'replica{i}'] = dict(
+        DATABASES['default'],
+        HOST=host,
+        PORT=int(port or DATABASES['default']['PORT']),
+        TEST={'MIRROR': 'default'},
+    )
+
+DATABASE_ROUTERS = ['api.backends.replica_router.ReplicaRouter']
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 5))
+REPLICA_PIN_COOKIE = 'primary_until'
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -154,3 +197,90 @@ FIXTURE_DIRS = (
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
+
+# How media files are sent: 'uwsgi' (X-Sendfile), 'nginx' (X-Accel-Redirect
+# to MEDIA_ACCEL_PREFIX) or 'django' (read in python, for local development)
+MEDIA_OFFLOAD = os.environ.get('MEDIA_OFFLOAD', 'django')
+MEDIA_ACCEL_PREFIX = os.environ.get('MEDIA_ACCEL_PREFIX', '/protected-media/')
+# Cache lifetime (in seconds) of content addressed and other media files
+MEDIA_IMMUTABLE_MAX_AGE = 315360000
+MEDIA_MAX_AGE = 3600
+
+# Uploads are streamed to disk and hashed as they arrive, in a directory
+# inside MEDIA_ROOT so that stored files are renamed instead of copied
+FILE_UPLOAD_HANDLERS = ['api.backends.upload_handler.HashingFileUploadHandler']
+FILE_UPLOAD_TEMP_DIR = os.path.join(MEDIA_ROOT, 'tmp')
+FILE_UPLOAD_PERMISSIONS = 0o644
+
+# Sizes (in px) of the resized variants of profile pictures
+IMAGE_VARIANT_SIZES = (64, 256)
+IMAGE_VARIANT_WORKERS = 1
+
+# Pagination
+# Default and maximum number of rows in a page of the list endpoints
+PAGE_SIZE = int(os.environ.get('PAGE_SIZE', 50))
+MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', 500))
+
+# Rate limits per route name (see api/urls.py), as (capacity, period in
+# seconds) of token buckets keyed on the client's ip and on the email
+RATE_LIMITS = {
+    'user-login': {'ip': (30, 60), 'email': (5, 60)},
+    'user-register': {'ip': (10, 60), 'email': (3, 3600)},
+    'user-pass-reset': {'ip': (10, 60), 'email': (3, 3600)},
+}
+# Request header holding the client's ip
+RATE_LIMIT_IP_HEADER = os.environ.get('RATE_LIMIT_IP_HEADER', 'REMOTE_ADDR')
+# uwsgi cache shared by the workers, buckets are kept per process without it
+RATE_LIMIT_UWSGI_CACHE = os.environ.get('RATE_LIMIT_UWSGI_CACHE', 'ratelimit')
+
+# Largest list of members admin_user/add_members accepts at once
+MAX_MEMBERS_PER_REQUEST = 1000
+
+# Serve the read only endpoints with async views, set by researchportal/asgi.py
+ASYNC_READ_VIEWS = os.environ.get('ASYNC_READ_VIEWS', 'False') == 'True'
+
+# Response compression (api/middleware/compression.py): smallest response
+# compressed, and levels for responses compressed once per request and once
+# per cache entry. Brotli is only offered when the brotli package is installed.
+COMPRESSION_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+GZIP_LEVEL_CACHED = 9
+BROTLI_QUALITY = 5
+BROTLI_QUALITY_CACHED = 11
+
+# Streaming responses
+# Rows fetched per round trip from the server side cursor, and bytes
+# buffered before a chunk of the response is written out
+STREAM_CHUNK_SIZE = 2000
+STREAM_BUFFER_SIZE = 64 * 1024
+# Under ASGI streamed responses are written to a temporary file before
+# they are sent (api/views/read_async.py), kept in memory up to this size
+STREAM_SPOOL_SIZE = 4 * 1024 * 1024
+
+# Project search
+# Text search configuration used for the project search vector
+SEARCH_CONFIG = 'english'
+
+# Cache of recent search results, invalidated by writes to the searched
+# tables. Under uwsgi the workers share the invalidations through a uwsgi cache.
+SEARCH_CACHE_SIZE = 2048
+SEARCH_CACHE_TTL = int(os.environ.get('SEARCH_CACHE_TTL', 300))
+SEARCH_UWSGI_CACHE = os.environ.get('SEARCH_UWSGI_CACHE', 'search')
+# The versions of the cached reference data (departments, areas of research,
+# centers) are kept along with the search generation
+REFERENCE_UWSGI_CACHE = os.environ.get('REFERENCE_UWSGI_CACHE', SEARCH_UWSGI_CACHE)
+# uwsgi cache holding the generation of the cached privileges
+PRIVILEGE_UWSGI_CACHE = os.environ.get('PRIVILEGE_UWSGI_CACHE', SEARCH_UWSGI_CACHE)
+
+# Search facets: most values returned per facet, and cache of the facets of recent searches
+FACET_LIMIT = 20
+FACET_CACHE_SIZE = 1024
+FACET_CACHE_TTL = int(os.environ.get('FACET_CACHE_TTL', 60))
+
+# Search box suggestions: shortest query suggested for, default and
+# largest number of suggestions, and cache of recent suggestions
+SUGGEST_MIN_LENGTH = 2
+SUGGEST_LIMIT = 10
+MAX_SUGGEST_LIMIT = 25
+SUGGEST_CACHE_SIZE = 4096
+SUGGEST_CACHE_TTL = int(os.environ.get('SUGGEST_CACHE_TTL', 60))